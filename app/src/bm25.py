@@ -0,0 +1,249 @@
+import heapq
+from bisect import bisect_left
+from collections import Counter
+import numpy as np
+from processor import tokenize, build_query, collect_page_sections
+
+def build_inverted_index(texts, k1=1.2, b=0.75):
+    """
+    Build a BM25 inverted index over a list of texts.
+
+    Postings are kept in flat numpy arrays: the postings of term t are
+    doc_ids[offsets[t]:offsets[t + 1]] (sorted) with matching term_freqs.
+
+    Args:
+        texts (list): List of texts to index
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 length normalization
+
+    Returns:
+        dict: Inverted index
+    """
+    terms = {}
+    posting_terms = []
+    posting_docs = []
+    posting_freqs = []
+    doc_lengths = np.zeros(len(texts), dtype=np.float32)
+
+    for doc_id, text in enumerate(texts):
+        tokens = tokenize(text)
+        doc_lengths[doc_id] = len(tokens)
+        for term, freq in Counter(tokens).items():
+            posting_terms.append(terms.setdefault(term, len(terms)))
+            posting_docs.append(doc_id)
+            posting_freqs.append(freq)
+
+    return build_index_from_postings(terms, posting_terms, posting_docs, posting_freqs, doc_lengths, k1=k1, b=b)
+
+def build_index_from_postings(terms, posting_terms, posting_docs, posting_freqs, doc_lengths, k1=1.2, b=0.75):
+    """
+    Build a BM25 inverted index from (term_id, doc_id, freq) postings.
+
+    Args:
+        terms (dict): Dictionary with term as key and term id as value
+        posting_terms (array-like): Term id of each posting
+        posting_docs (array-like): Document id of each posting
+        posting_freqs (array-like): Term frequency of each posting
+        doc_lengths (array-like): Number of terms in each document
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 length normalization
+
+    Returns:
+        dict: Inverted index
+    """
+    posting_terms = np.asarray(posting_terms, dtype=np.int32)
+    posting_docs = np.asarray(posting_docs, dtype=np.int32)
+    posting_freqs = np.asarray(posting_freqs, dtype=np.int32)
+    doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+
+    order = np.lexsort((posting_docs, posting_terms))
+    posting_terms = posting_terms[order]
+    doc_ids = posting_docs[order]
+    term_freqs = posting_freqs[order]
+
+    n_terms = len(terms)
+    doc_freqs = np.bincount(posting_terms, minlength=n_terms)
+    offsets = np.zeros(n_terms + 1, dtype=np.int64)
+    np.cumsum(doc_freqs, out=offsets[1:])
+
+    n_docs = len(doc_lengths)
+    avg_doc_length = float(doc_lengths.mean()) if n_docs and doc_lengths.sum() else 1.0
+    idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+    length_norms = k1 * (1 - b + b * doc_lengths / avg_doc_length)
+
+    # Upper bound of each term's contribution, used to skip documents during top-k search
+    max_scores = np.zeros(n_terms, dtype=np.float64)
+    if len(doc_ids):
+        posting_scores = idf[posting_terms] * term_freqs * (k1 + 1) / (term_freqs + length_norms[doc_ids])
+        max_scores[doc_freqs > 0] = np.maximum.reduceat(posting_scores, offsets[:-1][doc_freqs > 0])
+
+    return {
+        'terms': terms,
+        'offsets': offsets,
+        'doc_ids': doc_ids,
+        'term_freqs': term_freqs,
+        'idf': idf,
+        'max_scores': max_scores,
+        'length_norms': length_norms,
+        'n_docs': n_docs,
+        'k1': k1
+    }
+
+def search(index, query, top_k=5):
+    """
+    Find the top-k documents for a query using BM25 with MaxScore pruning.
+
+    Query terms are processed in order of their score upper bound. Terms whose
+    combined upper bound cannot lift a document into the current top-k are
+    only probed for documents already found through the other terms, so the
+    work done follows the matching postings rather than the corpus size.
+
+    Args:
+        index (dict): Inverted index from build_inverted_index
+        query (str): Query text
+        top_k (int): Number of documents to return
+
+    Returns:
+        list: List of (doc_id, score) tuples, best first
+    """
+    query_terms = Counter(term for term in tokenize(query) if term in index['terms'])
+    if not query_terms or top_k <= 0:
+        return []
+
+    k1 = index['k1']
+    length_norms = index['length_norms']
+
+    lists = []
+    for term, weight in query_terms.items():
+        term_id = index['terms'][term]
+        start, end = index['offsets'][term_id], index['offsets'][term_id + 1]
+        lists.append((
+            weight * index['max_scores'][term_id],
+            weight * index['idf'][term_id],
+            index['doc_ids'][start:end].tolist(),
+            index['term_freqs'][start:end].tolist()
+        ))
+    lists.sort(key=lambda item: item[0])
+
+    upper_bounds = [item[0] for item in lists]
+    weights = [item[1] for item in lists]
+    doc_lists = [item[2] for item in lists]
+    freq_lists = [item[3] for item in lists]
+    prefix_bounds = np.cumsum(upper_bounds).tolist()
+    cursors = [0] * len(lists)
+
+    def term_score(i, pos, doc):
+        tf = freq_lists[i][pos]
+        return weights[i] * tf * (k1 + 1) / (tf + length_norms[doc])
+
+    # Min-heap of (score, -doc_id) so that ties keep the lower doc id
+    heap = []
+    threshold = 0.0
+    first_essential = 0
+
+    while True:
+        # Terms before first_essential cannot reach the top-k on their own
+        while first_essential < len(lists) and prefix_bounds[first_essential] <= threshold:
+            first_essential += 1
+        if first_essential == len(lists):
+            break
+
+        doc = None
+        for i in range(first_essential, len(lists)):
+            if cursors[i] < len(doc_lists[i]):
+                candidate = doc_lists[i][cursors[i]]
+                if doc is None or candidate < doc:
+                    doc = candidate
+        if doc is None:
+            break
+
+        score = 0.0
+        for i in range(first_essential, len(lists)):
+            pos = cursors[i]
+            if pos < len(doc_lists[i]) and doc_lists[i][pos] == doc:
+                score += term_score(i, pos, doc)
+                cursors[i] = pos + 1
+
+        for i in range(first_essential - 1, -1, -1):
+            if score + prefix_bounds[i] <= threshold:
+                break
+            pos = bisect_left(doc_lists[i], doc, cursors[i])
+            cursors[i] = pos
+            if pos < len(doc_lists[i]) and doc_lists[i][pos] == doc:
+                score += term_score(i, pos, doc)
+
+        if len(heap) < top_k:
+            heapq.heappush(heap, (score, -doc))
+        elif score > threshold:
+            heapq.heapreplace(heap, (score, -doc))
+        if len(heap) == top_k:
+            threshold = heap[0][0]
+
+    return [(-neg_doc, float(score)) for score, neg_doc in sorted(heap, key=lambda item: (-item[0], -item[1]))]
+
+def build_index_from_corpus(corpus, page_ids, k1=1.2, b=0.75):
+    """
+    Build a BM25 inverted index over pages of a tokenized corpus, without re-tokenizing.
+
+    Args:
+        corpus (dict): Corpus from corpus.build_corpus
+        page_ids (np.ndarray): Corpus page indices to index, in document id order
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 length normalization
+
+    Returns:
+        dict: Inverted index
+    """
+    from corpus import page_counts
+
+    counts = page_counts(corpus)[page_ids]
+    posting_docs = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    doc_lengths = np.diff(corpus['page_offsets'])[page_ids]
+    return build_index_from_postings(corpus['terms'], counts.indices, posting_docs, counts.data, doc_lengths, k1=k1, b=b)
+
+def rank_sections_bm25(persona, job, docs_text, top_k=5, k1=1.2, b=0.75, corpus=None):
+    """
+    Rank sections with BM25 over an inverted index of the pages.
+
+    Args:
+        persona (str): User persona
+        job (str): Job to be done
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        top_k (int): Number of sections to return
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 length normalization
+        corpus (dict): Tokenized corpus of docs_text from corpus.build_corpus (optional)
+
+    Returns:
+        list: List of dictionaries containing ranked sections
+    """
+    if corpus is not None:
+        page_ids, first_sections = np.unique(corpus['section_pages'], return_index=True)
+        if not len(page_ids):
+            return []
+        bounds = list(first_sections) + [len(corpus['section_pages'])]
+        pages = [
+            corpus['pages'][page_id] + (None, corpus['section_titles'][bounds[i]:bounds[i + 1]])
+            for i, page_id in enumerate(page_ids)
+        ]
+        index = build_index_from_corpus(corpus, page_ids, k1=k1, b=b)
+    else:
+        pages = collect_page_sections(docs_text)
+        if not pages:
+            return []
+        index = build_inverted_index([text for _, _, text, _ in pages], k1=k1, b=b)
+
+    # Every page carries at least one section, so top_k pages cover top_k sections
+    ranked_sections = []
+    for page_id, score in search(index, build_query(persona, job), top_k=top_k):
+        filename, page_num, _, sections = pages[page_id]
+        for section in sections:
+            ranked_sections.append({
+                'document': filename,
+                'page': page_num,
+                'section_title': section,
+                'importance_rank': len(ranked_sections) + 1,
+                'relevance_score': score
+            })
+
+    return ranked_sections[:top_k]
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+import scipy.sparse as sp
+from processor import tokenize, identify_sections_with_offsets
+
+def load_dictionary(path):
+    """
+    Load a persisted term dictionary.
+
+    Args:
+        path (str): Path to the JSON term list
+
+    Returns:
+        dict: Dictionary with term as key and term id as value (empty if the file does not exist)
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {term: term_id for term_id, term in enumerate(json.load(f))}
+
+def save_dictionary(terms, path):
+    """
+    Persist a term dictionary as a JSON list ordered by term id.
+
+    Args:
+        terms (dict): Dictionary with term as key and term id as value
+        path (str): Path to the JSON term list
+    """
+    ordered = [None] * len(terms)
+    for term, term_id in terms.items():
+        ordered[term_id] = term
+    with _atomic_file(path, 'w', encoding='utf-8') as f:
+        json.dump(ordered, f)
+
+@contextmanager
+def _atomic_file(path, mode, **kwargs):
+    """Write to a unique temporary file next to path and move it into place on success"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def build_corpus(docs_text, terms=None):
+    """
+    Tokenize every page once into arrays of term ids.
+
+    Token ids of all pages are concatenated into one array; page i covers
+    tokens[page_offsets[i]:page_offsets[i + 1]] and section j covers
+    tokens[section_bounds[j, 0]:section_bounds[j, 1]]. New terms are added
+    to the dictionary as they are seen.
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        terms (dict): Term dictionary to extend (a new one is created if omitted)
+
+    Returns:
+        dict: Tokenized corpus
+    """
+    terms = {} if terms is None else terms
+    tokens = []
+    n_tokens = 0
+    pages = []
+    page_offsets = [0]
+    section_pages = []
+    section_bounds = []
+    section_titles = []
+
+    for filename, content in docs_text.items():
+        for page_num, text in content:
+            spans = identify_sections_with_offsets(text)
+
+            # If no sections found, use the first line as a placeholder
+            if not spans and text.strip():
+                first_line = text.strip().split('\n')[0]
+                if len(first_line) > 10:  # Ensure it's not too short
+                    spans = [(first_line[:50] + '...', 0, len(text))]
+
+            # Sections start on line boundaries, so tokenizing each segment separately
+            # gives exactly the tokens of the whole page
+            boundaries = [0] + [start for _, start, _ in spans] + [len(text)]
+            segment_offsets = []
+            for start, end in zip(boundaries[:-1], boundaries[1:]):
+                segment_offsets.append(n_tokens)
+                ids = np.fromiter((terms.setdefault(term, len(terms)) for term in tokenize(text[start:end])), dtype=np.int32)
+                tokens.append(ids)
+                n_tokens += len(ids)
+            segment_offsets.append(n_tokens)
+
+            for i, (title, _, _) in enumerate(spans):
+                section_pages.append(len(pages))
+                section_bounds.append((segment_offsets[i + 1], segment_offsets[i + 2]))
+                section_titles.append(title)
+
+            pages.append((filename, page_num))
+            page_offsets.append(n_tokens)
+
+    return {
+        'terms': terms,
+        'tokens': np.concatenate(tokens) if tokens else np.zeros(0, dtype=np.int32),
+        'pages': pages,
+        'page_offsets': np.asarray(page_offsets, dtype=np.int64),
+        'section_pages': np.asarray(section_pages, dtype=np.int64),
+        'section_bounds': np.asarray(section_bounds, dtype=np.int64).reshape(-1, 2),
+        'section_titles': section_titles
+    }
+
+def save_corpus(corpus, path):
+    """
+    Save a tokenized corpus to a .npz file (the term dictionary is saved separately).
+
+    Args:
+        corpus (dict): Corpus from build_corpus
+        path (str): Path to the .npz file
+    """
+    metadata = json.dumps({'pages': corpus['pages'], 'section_titles': corpus['section_titles']})
+    with _atomic_file(path, 'wb') as f:
+        np.savez(
+            f,
+            tokens=corpus['tokens'],
+            page_offsets=corpus['page_offsets'],
+            section_pages=corpus['section_pages'],
+            section_bounds=corpus['section_bounds'],
+            metadata=np.array(metadata)
+        )
+
+def load_corpus(path, terms):
+    """
+    Load a tokenized corpus saved with save_corpus.
+
+    Args:
+        path (str): Path to the .npz file
+        terms (dict): Term dictionary the corpus was built with
+
+    Returns:
+        dict: Tokenized corpus
+    """
+    with np.load(path, allow_pickle=False) as data:
+        metadata = json.loads(str(data['metadata']))
+        return {
+            'terms': terms,
+            'tokens': data['tokens'],
+            'pages': [tuple(page) for page in metadata['pages']],
+            'page_offsets': data['page_offsets'],
+            'section_pages': data['section_pages'],
+            'section_bounds': data['section_bounds'],
+            'section_titles': metadata['section_titles']
+        }
+
+def corpus_key(docs_text):
+    """
+    Content hash of extracted pages, identifying the corpus built from them.
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha1()
+    for filename, content in docs_text.items():
+        digest.update(json.dumps([filename, content]).encode('utf-8'))
+    return digest.hexdigest()
+
+def load_or_build_corpus(docs_text, cache_dir, keep=8):
+    """
+    Load the tokenized corpus of docs_text from a cache directory, or build and cache it.
+
+    Each cache entry is a corpus .npz with its own term dictionary, keyed by
+    corpus_key, so unchanged inputs are not tokenized again and no dictionary
+    grows across runs. Entries that cannot be read are rebuilt, and only the
+    keep most recently used entries are kept.
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        cache_dir (str): Cache directory
+        keep (int): Number of cache entries to keep
+
+    Returns:
+        dict: Tokenized corpus
+    """
+    key = corpus_key(docs_text)
+    corpus_path = os.path.join(cache_dir, key + '.npz')
+    terms_path = os.path.join(cache_dir, key + '.terms.json')
+
+    if os.path.exists(corpus_path) and os.path.exists(terms_path):
+        try:
+            terms = load_dictionary(terms_path)
+            corpus = load_corpus(corpus_path, terms)
+            if len(corpus['tokens']) and corpus['tokens'].max() >= len(terms):
+                raise ValueError("corpus does not match its term dictionary")
+            os.utime(corpus_path)
+            return corpus
+        except Exception as e:
+            print(f"Rebuilding cached corpus {key}: {e}")
+
+    corpus = build_corpus(docs_text)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_dictionary(corpus['terms'], terms_path)
+    save_corpus(corpus, corpus_path)
+
+    entries = sorted(
+        (name for name in os.listdir(cache_dir) if name.endswith('.npz')),
+        key=lambda name: os.path.getmtime(os.path.join(cache_dir, name)),
+        reverse=True
+    )
+    for name in entries[keep:]:
+        for path in (name, name[:-len('.npz')] + '.terms.json'):
+            try:
+                os.remove(os.path.join(cache_dir, path))
+            except FileNotFoundError:
+                # Another run pruned it first
+                pass
+    return corpus
+
+def span_counts(tokens, starts, ends, n_cols):
+    """
+    Term-count matrix with one row per token span.
+
+    Args:
+        tokens (np.ndarray): Concatenated token ids
+        starts (np.ndarray): Start offset of each span
+        ends (np.ndarray): End offset of each span
+        n_cols (int): Number of columns (at least the dictionary size)
+
+    Returns:
+        scipy.sparse.csr_matrix: Term counts
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(ends, dtype=np.int64) - starts
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    positions = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+    counts = sp.csr_matrix(
+        (np.ones(len(positions)), (rows, tokens[positions])),
+        shape=(len(lengths), n_cols)
+    )
+    counts.sum_duplicates()
+    return counts
+
+def page_counts(corpus, n_cols=None):
+    """
+    Term-count matrix with one row per page.
+
+    Args:
+        corpus (dict): Corpus from build_corpus
+        n_cols (int): Number of columns (defaults to the dictionary size)
+
+    Returns:
+        scipy.sparse.csr_matrix: Term counts
+    """
+    offsets = corpus['page_offsets']
+    return span_counts(corpus['tokens'], offsets[:-1], offsets[1:], n_cols or len(corpus['terms']))
+
+def query_counts(corpus, text):
+    """
+    Term counts of a query against the corpus dictionary.
+
+    Terms missing from the dictionary get extra columns after it, so the
+    query norm is the same as if the query had been vectorized with the corpus.
+
+    Args:
+        corpus (dict): Corpus from build_corpus
+        text (str): Query text
+
+    Returns:
+        scipy.sparse.csr_matrix: One-row term counts with len(terms) + unknown columns
+    """
+    terms = corpus['terms']
+    unknown = {}
+    ids = []
+    for term in tokenize(text):
+        if term in terms:
+            ids.append(terms[term])
+        else:
+            ids.append(len(terms) + unknown.setdefault(term, len(unknown)))
+    counts = sp.csr_matrix(
+        (np.ones(len(ids)), (np.zeros(len(ids), dtype=np.int64), ids)),
+        shape=(1, len(terms) + len(unknown))
+    )
+    counts.sum_duplicates()
+    return counts
@@ -0,0 +1,155 @@
+import re
+import zlib
+from collections import Counter
+import numpy as np
+
+# Mersenne prime used for the MinHash permutations
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+WORD_PATTERN = re.compile(r'\w+')
+DIGIT_PATTERN = re.compile(r'\d+')
+
+def normalize_line(line):
+    """Normalize a line so that repeated headers and footers compare equal (e.g. 'Page 3' vs 'Page 4')"""
+    return DIGIT_PATTERN.sub('#', ' '.join(line.lower().split()))
+
+def strip_boilerplate(docs_text, min_ratio=0.6, min_pages=3):
+    """
+    Remove lines that repeat across most pages of a document.
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        min_ratio (float): Fraction of a document's pages a line must appear on to be stripped
+        min_pages (int): Documents with fewer pages are left untouched
+
+    Returns:
+        dict: Dictionary with filename as key and list of (page_num, text) as value
+    """
+    stripped = {}
+    for filename, content in docs_text.items():
+        if len(content) < min_pages:
+            stripped[filename] = list(content)
+            continue
+
+        line_counts = Counter()
+        for _, text in content:
+            line_counts.update({normalize_line(line) for line in text.split('\n') if line.strip()})
+
+        boilerplate = {line for line, count in line_counts.items() if count >= min_ratio * len(content)}
+        stripped[filename] = [
+            (page_num, '\n'.join(line for line in text.split('\n') if normalize_line(line) not in boilerplate))
+            for page_num, text in content
+        ]
+
+    return stripped
+
+def minhash_signature(text, num_perm=64, shingle_size=5, seed=1):
+    """
+    Compute a MinHash signature over the word shingles of a text.
+
+    Args:
+        text (str): Text to sign
+        num_perm (int): Number of hash permutations
+        shingle_size (int): Number of words per shingle
+        seed (int): Seed for the permutation parameters
+
+    Returns:
+        np.ndarray: Signature of num_perm unsigned integers
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return np.full(num_perm, MAX_HASH, dtype=np.uint64)
+
+    shingles = {' '.join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))}
+    hashes = np.array([zlib.crc32(shingle.encode('utf-8')) for shingle in shingles], dtype=np.uint64)
+
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, MAX_HASH, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    # (a * x + b) mod p, truncated to 32 bits; products stay below 2**64
+    permuted = (np.outer(hashes, a) + b) % np.uint64(MERSENNE_PRIME) & np.uint64(MAX_HASH)
+    return permuted.min(axis=0)
+
+def find_near_duplicates(signatures, threshold=0.9, bands=16):
+    """
+    Group near-duplicate signatures using locality-sensitive hashing.
+
+    Args:
+        signatures (list): List of MinHash signatures of equal length
+        threshold (float): Minimum estimated Jaccard similarity of duplicates
+        bands (int): Number of LSH bands (must divide the signature length)
+
+    Returns:
+        list: Index of each signature's group representative (the first member of its group)
+    """
+    parents = list(range(len(signatures)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    if not signatures:
+        return []
+
+    rows = len(signatures[0]) // bands
+    for band in range(bands):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            key = signature[band * rows:(band + 1) * rows].tobytes()
+            if key not in buckets:
+                buckets[key] = i
+                continue
+
+            first = buckets[key]
+            root_first, root_i = find(first), find(i)
+            if root_first != root_i and np.mean(signatures[first] == signature) >= threshold:
+                parents[max(root_first, root_i)] = min(root_first, root_i)
+
+    return [find(i) for i in range(len(signatures))]
+
+def deduplicate_pages(docs_text, threshold=0.9, strip_ratio=0.6):
+    """
+    Strip repeated boilerplate lines and collapse near-duplicate pages.
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        threshold (float): Minimum estimated Jaccard similarity of duplicate pages
+        strip_ratio (float): Fraction of a document's pages a line must appear on to be stripped
+
+    Returns:
+        tuple: (docs_text, duplicates) where docs_text only keeps one page per duplicate group and
+            duplicates maps each kept (filename, page_num) to the list of (filename, page_num) it replaces
+    """
+    stripped = strip_boilerplate(docs_text, min_ratio=strip_ratio)
+
+    kept = set()
+    locations = []
+    signatures = []
+    for filename, content in stripped.items():
+        for page_num, text in content:
+            if not WORD_PATTERN.search(text):
+                # Blank pages would all share one signature; they are kept and never reported as duplicates
+                kept.add((filename, page_num))
+                continue
+            locations.append((filename, page_num))
+            signatures.append(minhash_signature(text))
+
+    representatives = find_near_duplicates(signatures, threshold=threshold)
+
+    duplicates = {}
+    for i, representative in enumerate(representatives):
+        if representative == i:
+            kept.add(locations[i])
+        else:
+            duplicates.setdefault(locations[representative], []).append(locations[i])
+
+    deduplicated = {
+        filename: [(page_num, text) for page_num, text in content if (filename, page_num) in kept]
+        for filename, content in stripped.items()
+    }
+
+    return deduplicated, duplicates
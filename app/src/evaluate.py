@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tracemalloc
+from processor import process_documents
+from corpus import build_corpus
+from main import load_persona
+
+# Ranking configurations compared by default; keys are passed to process_documents,
+# except 'corpus': True, which passes a tokenized corpus built before timing starts
+DEFAULT_VARIANTS = [
+    {'name': 'tfidf', 'scorer': 'tfidf'},
+    {'name': 'tfidf-top3', 'scorer': 'tfidf', 'top_k': 3},
+    {'name': 'tfidf-top10', 'scorer': 'tfidf', 'top_k': 10},
+    {'name': 'tfidf-corpus', 'scorer': 'tfidf', 'corpus': True},
+    {'name': 'tfidf-dedup', 'scorer': 'tfidf', 'dedup': True},
+    {'name': 'bm25', 'scorer': 'bm25'},
+    {'name': 'bm25-corpus', 'scorer': 'bm25', 'corpus': True},
+    {'name': 'hashing', 'scorer': 'hashing'},
+    {'name': 'hierarchical', 'scorer': 'hierarchical'},
+    {'name': 'hierarchical-short-passages', 'scorer': 'hierarchical', 'scorer_options': {'passage_words': 30}},
+    {'name': 'hierarchical-wide', 'scorer': 'hierarchical', 'scorer_options': {'top_docs': 10, 'top_sections': 50}}
+]
+
+def load_fixture(path):
+    """
+    Load a labelled relevance fixture.
+
+    A fixture is a persona config in the input/1.json format with two extra keys:
+    'expected_sections', a list of {'document', 'page_number', 'relevance'} judgments
+    (optionally with 'section_title'), and either 'pages' (filename -> [[page_num, text], ...])
+    or 'pdf_dir', a directory of PDFs relative to the fixture.
+
+    Args:
+        path (str): Path to the fixture JSON
+
+    Returns:
+        dict: Fixture with 'name', 'persona', 'job', 'docs_text' and 'judgments'
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    persona, job, _ = load_persona(path)
+
+    if 'pages' in data:
+        docs_text = {
+            filename: [(page_num, text) for page_num, text in pages]
+            for filename, pages in data['pages'].items()
+        }
+    else:
+        from utils import extract_all_pdfs
+        docs_text = extract_all_pdfs(os.path.join(os.path.dirname(path), data['pdf_dir']))
+
+    return {
+        'name': os.path.splitext(os.path.basename(path))[0],
+        'persona': persona,
+        'job': job,
+        'docs_text': docs_text,
+        'judgments': data.get('expected_sections', [])
+    }
+
+def _gains(sections, judgments, k):
+    """Relevance grade of each of the top-k sections, crediting each judgment once"""
+    remaining = list(judgments)
+    gains = []
+    for section in sections[:k]:
+        gain = 0
+        for judgment in remaining:
+            if (judgment['document'] == section['document']
+                    and judgment['page_number'] == section['page_number']
+                    and judgment.get('section_title', section['section_title']) == section['section_title']):
+                gain = judgment.get('relevance', 1)
+                remaining.remove(judgment)
+                break
+        gains.append(gain)
+    return gains
+
+def ndcg_at_k(sections, judgments, k):
+    """
+    Normalized discounted cumulative gain of a ranking.
+
+    Args:
+        sections (list): 'extracted_sections' of an analysis result
+        judgments (list): Expected sections with 'relevance' grades
+        k (int): Cutoff rank
+
+    Returns:
+        float: nDCG@k between 0 and 1
+    """
+    def dcg(grades):
+        return sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(grades))
+
+    ideal = dcg(sorted((judgment.get('relevance', 1) for judgment in judgments), reverse=True)[:k])
+    return dcg(_gains(sections, judgments, k)) / ideal if ideal else 0.0
+
+def recall_at_k(sections, judgments, k):
+    """
+    Fraction of relevant expected sections found in the top k.
+
+    Args:
+        sections (list): 'extracted_sections' of an analysis result
+        judgments (list): Expected sections with 'relevance' grades
+        k (int): Cutoff rank
+
+    Returns:
+        float: Recall@k between 0 and 1
+    """
+    relevant = [judgment for judgment in judgments if judgment.get('relevance', 1) > 0]
+    if not relevant:
+        return 0.0
+    return sum(1 for gain in _gains(sections, relevant, k) if gain > 0) / len(relevant)
+
+def evaluate_variant(fixtures, variant, k=5, repeats=3):
+    """
+    Run one ranking configuration over all fixtures and measure quality, latency and memory.
+
+    Args:
+        fixtures (list): Fixtures from load_fixture
+        variant (dict): Configuration with a 'name' and process_documents keyword arguments;
+            'corpus': True passes a tokenized corpus of each fixture, built outside the measurements
+        k (int): Cutoff rank for the metrics
+        repeats (int): Runs per fixture; the median latency is reported
+
+    Returns:
+        dict: Report with mean 'ndcg', 'recall', 'latency_ms' and 'peak_memory_mb'
+    """
+    options = {key: value for key, value in variant.items() if key not in ('name', 'corpus')}
+    options.setdefault('top_k', k)
+
+    ndcgs, recalls, latencies, peaks = [], [], [], []
+    for fixture in fixtures:
+        if variant.get('corpus'):
+            # In production the corpus is built (or loaded from cache) at extraction time
+            options['corpus'] = build_corpus(fixture['docs_text'])
+
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = process_documents(fixture['persona'], fixture['job'], fixture['docs_text'], **options)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        process_documents(fixture['persona'], fixture['job'], fixture['docs_text'], **options)
+        peaks.append(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+        tracemalloc.stop()
+
+        sections = result['extracted_sections']
+        ndcgs.append(ndcg_at_k(sections, fixture['judgments'], k))
+        recalls.append(recall_at_k(sections, fixture['judgments'], k))
+        latencies.append(sorted(timings)[len(timings) // 2] * 1000)
+
+    def mean(values):
+        return sum(values) / len(values) if values else 0.0
+
+    return {
+        'name': variant['name'],
+        'ndcg': mean(ndcgs),
+        'recall': mean(recalls),
+        'latency_ms': mean(latencies),
+        'peak_memory_mb': mean(peaks)
+    }
+
+def pareto_frontier(reports):
+    """
+    Mark the reports that no other report beats on both nDCG and latency.
+
+    Args:
+        reports (list): Reports from evaluate_variant
+
+    Returns:
+        list: The same reports with a 'pareto' flag added
+    """
+    for report in reports:
+        report['pareto'] = not any(
+            other['ndcg'] >= report['ndcg'] and other['latency_ms'] <= report['latency_ms']
+            and (other['ndcg'] > report['ndcg'] or other['latency_ms'] < report['latency_ms'])
+            for other in reports if other is not report
+        )
+    return reports
+
+def run_evaluation(fixture_dir, variants=None, k=5, repeats=3):
+    """
+    Evaluate ranking configurations over every fixture in a directory.
+
+    Args:
+        fixture_dir (str): Directory of fixture JSON files
+        variants (list): Configurations to compare (defaults to DEFAULT_VARIANTS)
+        k (int): Cutoff rank for the metrics
+        repeats (int): Runs per fixture for latency
+
+    Returns:
+        list: Reports from evaluate_variant, with Pareto flags
+    """
+    fixtures = [
+        load_fixture(os.path.join(fixture_dir, name))
+        for name in sorted(os.listdir(fixture_dir)) if name.lower().endswith('.json')
+    ]
+    if not fixtures:
+        raise ValueError(f"No fixtures found in {fixture_dir}")
+
+    return pareto_frontier([evaluate_variant(fixtures, variant, k, repeats) for variant in variants or DEFAULT_VARIANTS])
+
+def print_reports(reports, k):
+    """Print the evaluation reports as a table"""
+    print(f"\n{'configuration':<30} {'nDCG@' + str(k):>8} {'recall@' + str(k):>9} {'latency ms':>11} {'peak MB':>8}  pareto")
+    for report in reports:
+        print(f"{report['name']:<30} {report['ndcg']:>8.3f} {report['recall']:>9.3f} "
+              f"{report['latency_ms']:>11.1f} {report['peak_memory_mb']:>8.2f}  {'*' if report['pareto'] else ''}")
+
+def main():
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Compare ranking configurations on labelled fixtures.")
+    parser.add_argument('--fixtures', default=os.path.join(base_dir, 'tests', 'fixtures', 'relevance'))
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help="Also write the reports to this JSON file")
+    args = parser.parse_args()
+
+    reports = run_evaluation(args.fixtures, k=args.k, repeats=args.repeats)
+    print_reports(reports, args.k)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"\n❌ Evaluation failed: {e}")
+        sys.exit(1)
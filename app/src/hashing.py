@@ -0,0 +1,161 @@
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.metrics.pairwise import linear_kernel
+from sklearn.preprocessing import normalize
+from processor import build_query, collect_page_sections
+
+DEFAULT_N_FEATURES = 2 ** 18
+
+def make_hashing_vectorizer(n_features=DEFAULT_N_FEATURES):
+    """
+    Create a vocabulary-free vectorizer producing raw term counts.
+
+    Args:
+        n_features (int): Width of the hashed feature space
+
+    Returns:
+        HashingVectorizer: Stateless vectorizer
+    """
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words='english',
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32
+    )
+
+def vectorize_shard(texts, n_features=DEFAULT_N_FEATURES):
+    """
+    Hash a shard of texts into term counts and document frequencies.
+
+    Args:
+        texts (list): List of texts in the shard
+        n_features (int): Width of the hashed feature space
+
+    Returns:
+        dict: Shard result with 'counts' (sparse matrix), 'doc_freqs' and 'n_docs'
+    """
+    if texts:
+        counts = make_hashing_vectorizer(n_features).transform(texts).tocsr()
+    else:
+        # HashingVectorizer cannot transform an empty list
+        counts = sp.csr_matrix((0, n_features), dtype=np.float32)
+    doc_freqs = np.bincount(counts.indices, minlength=n_features).astype(np.int64)
+    return {
+        'counts': counts,
+        'doc_freqs': doc_freqs,
+        'n_docs': len(texts)
+    }
+
+def merge_doc_freqs(shards):
+    """
+    Combine the document-frequency counts of several shards.
+
+    Args:
+        shards (list): List of shard results from vectorize_shard
+
+    Returns:
+        tuple: (doc_freqs, n_docs) over all shards
+    """
+    doc_freqs = np.zeros_like(shards[0]['doc_freqs'])
+    n_docs = 0
+    for shard in shards:
+        doc_freqs += shard['doc_freqs']
+        n_docs += shard['n_docs']
+    return doc_freqs, n_docs
+
+def compute_idf(doc_freqs, n_docs):
+    """
+    Compute smoothed IDF weights, matching TfidfVectorizer's defaults.
+
+    Args:
+        doc_freqs (np.ndarray): Document frequency of each feature
+        n_docs (int): Total number of documents
+
+    Returns:
+        np.ndarray: IDF weight of each feature
+    """
+    return (np.log((1 + n_docs) / (1 + doc_freqs)) + 1).astype(np.float32)
+
+def apply_idf(counts, idf):
+    """
+    Weight term counts by IDF and L2-normalize each row.
+
+    Args:
+        counts (scipy.sparse.csr_matrix): Term counts
+        idf (np.ndarray): IDF weight of each feature
+
+    Returns:
+        scipy.sparse.csr_matrix: TF-IDF matrix
+    """
+    weighted = counts.multiply(idf).tocsr()
+    return normalize(weighted) if weighted.shape[0] else weighted
+
+def vectorize_parallel(texts, n_features=DEFAULT_N_FEATURES, workers=1, shard_size=256):
+    """
+    Hash texts in independent shards, optionally across worker processes.
+
+    Args:
+        texts (list): List of texts
+        n_features (int): Width of the hashed feature space
+        workers (int): Number of worker processes (1 runs in-process)
+        shard_size (int): Number of texts per shard
+
+    Returns:
+        list: List of shard results in input order
+    """
+    chunks = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return [vectorize_shard(chunk, n_features) for chunk in chunks]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(vectorize_shard, chunks, [n_features] * len(chunks)))
+
+def rank_sections_hashing(persona, job, docs_text, top_k=5, n_features=DEFAULT_N_FEATURES, workers=1):
+    """
+    Rank sections with hashed TF-IDF features instead of a fitted vocabulary.
+
+    Args:
+        persona (str): User persona
+        job (str): Job to be done
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        top_k (int): Number of sections to return
+        n_features (int): Width of the hashed feature space
+        workers (int): Number of worker processes used for vectorizing pages
+
+    Returns:
+        list: List of dictionaries containing ranked sections
+    """
+    pages = collect_page_sections(docs_text)
+    if not pages:
+        return []
+
+    query = build_query(persona, job)
+    shards = vectorize_parallel([text for _, _, text, _ in pages], n_features, workers)
+    doc_freqs, n_docs = merge_doc_freqs(shards)
+    idf = compute_idf(doc_freqs, n_docs)
+
+    query_vector = apply_idf(make_hashing_vectorizer(n_features).transform([query]), idf)
+    page_scores = np.concatenate([
+        linear_kernel(query_vector, apply_idf(shard['counts'], idf)).ravel() for shard in shards
+    ])
+
+    ranked_sections = []
+    for (filename, page_num, _, sections), score in zip(pages, page_scores):
+        for section in sections:
+            ranked_sections.append({
+                'document': filename,
+                'page': page_num,
+                'section_title': section,
+                'relevance_score': float(score)
+            })
+
+    # Sort by relevance score (descending)
+    ranked_sections = sorted(ranked_sections, key=lambda x: x['relevance_score'], reverse=True)[:top_k]
+
+    for i, section in enumerate(ranked_sections):
+        section['importance_rank'] = i + 1
+
+    return ranked_sections
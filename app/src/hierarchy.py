@@ -0,0 +1,207 @@
+import re
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from processor import build_query, identify_sections_with_offsets
+
+WORD_SPAN_PATTERN = re.compile(r'\S+')
+
+def split_passages(text, start, end, passage_words=80):
+    """
+    Split a span of text into consecutive passages of roughly equal word count.
+
+    Args:
+        text (str): Page text
+        start (int): Start offset of the span
+        end (int): End offset of the span
+        passage_words (int): Number of words per passage
+
+    Returns:
+        list: List of (start, end) character offsets, one per passage
+    """
+    words = [(start + m.start(), start + m.end()) for m in WORD_SPAN_PATTERN.finditer(text[start:end])]
+    if not words:
+        return [(start, end)]
+    return [
+        (words[i][0], words[min(i + passage_words, len(words)) - 1][1])
+        for i in range(0, len(words), passage_words)
+    ]
+
+def _membership(groups, n_items):
+    """Sparse 0/1 matrix with one row per group, from item offsets"""
+    offsets = np.asarray(groups, dtype=np.int64)
+    counts = np.diff(offsets)
+    rows = np.repeat(np.arange(len(counts)), counts)
+    return sp.csr_matrix((np.ones(n_items), (rows, np.arange(n_items))), shape=(len(counts), n_items))
+
+def build_hierarchy(docs_text, passage_words=80):
+    """
+    Build a document -> section -> passage index.
+
+    Passages are vectorized with TF-IDF; a section vector is the normalized sum
+    of its passages and a document vector is the centroid of its sections.
+    Sections of one document and passages of one section are stored
+    contiguously, so the children of node i are offsets[i]:offsets[i + 1].
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        passage_words (int): Number of words per passage
+
+    Returns:
+        dict: Hierarchical index, or None if no sections were found
+    """
+    documents = []
+    sections = []
+    passages = []
+    doc_offsets = [0]
+    section_offsets = [0]
+
+    for filename, content in docs_text.items():
+        for page_num, text in content:
+            spans = identify_sections_with_offsets(text)
+
+            # If no sections found, use the first line as a placeholder
+            if not spans and text.strip():
+                first_line = text.strip().split('\n')[0]
+                if len(first_line) > 10:  # Ensure it's not too short
+                    spans = [(first_line[:50] + '...', 0, len(text))]
+
+            for title, start, end in spans:
+                sections.append({
+                    'document': filename,
+                    'page': page_num,
+                    'section_title': title,
+                    'start': start,
+                    'end': end
+                })
+                for passage_start, passage_end in split_passages(text, start, end, passage_words):
+                    passages.append({
+                        'section': len(sections) - 1,
+                        'text': text[passage_start:passage_end],
+                        'start': passage_start,
+                        'end': passage_end
+                    })
+                section_offsets.append(len(passages))
+
+        if len(sections) > doc_offsets[-1]:
+            documents.append(filename)
+            doc_offsets.append(len(sections))
+
+    if not passages:
+        return None
+
+    vectorizer = TfidfVectorizer(stop_words='english')
+    try:
+        passage_matrix = vectorizer.fit_transform([passage['text'] for passage in passages])
+    except ValueError:
+        # Every passage was empty or made of stop words only
+        return None
+
+    section_matrix = normalize(_membership(section_offsets, len(passages)) @ passage_matrix)
+    document_matrix = normalize(_membership(doc_offsets, len(sections)) @ section_matrix)
+
+    return {
+        'vectorizer': vectorizer,
+        'documents': documents,
+        'sections': sections,
+        'passages': passages,
+        'doc_offsets': np.asarray(doc_offsets),
+        'section_offsets': np.asarray(section_offsets),
+        'document_matrix': document_matrix.tocsr(),
+        'section_matrix': section_matrix.tocsr(),
+        'passage_matrix': passage_matrix.tocsr()
+    }
+
+def _top(scores, candidates, n):
+    """Best n candidates by score, keeping candidate order on ties"""
+    order = np.argsort(-scores, kind='stable')[:n]
+    return candidates[order], scores[order]
+
+def _children(offsets, parents):
+    """Concatenate the child index ranges of the given parent nodes"""
+    return np.concatenate([np.arange(offsets[i], offsets[i + 1]) for i in parents])
+
+def search_hierarchy(index, query, top_docs=3, top_sections=10, top_k=5):
+    """
+    Coarse-to-fine search: documents first, then their sections, then passages.
+
+    Only the sections of the best documents are scored, and only the passages
+    of the best sections; those sections are finally ordered by their best passage.
+
+    Args:
+        index (dict): Index from build_hierarchy
+        query (str): Query text
+        top_docs (int): Documents kept after the first stage
+        top_sections (int): Sections kept after the second stage
+        top_k (int): Number of sections to return
+
+    Returns:
+        list: List of (section_id, score, passage_id) tuples, best first
+    """
+    query_vector = normalize(index['vectorizer'].transform([query]))
+
+    doc_ids = np.arange(len(index['documents']))
+    doc_scores = (index['document_matrix'] @ query_vector.T).toarray().ravel()
+    doc_ids, _ = _top(doc_scores, doc_ids, top_docs)
+
+    section_ids = _children(index['doc_offsets'], sorted(doc_ids))
+    section_scores = (index['section_matrix'][section_ids] @ query_vector.T).toarray().ravel()
+    section_ids, section_scores = _top(section_scores, section_ids, max(top_sections, top_k))
+
+    # Score every passage of the surviving sections in one pass
+    section_offsets = index['section_offsets']
+    passage_ids = _children(section_offsets, section_ids)
+    passage_scores = (index['passage_matrix'][passage_ids] @ query_vector.T).toarray().ravel()
+    bounds = np.concatenate([[0], np.cumsum(section_offsets[section_ids + 1] - section_offsets[section_ids])])
+
+    candidates = []
+    for i, (section_id, section_score) in enumerate(zip(section_ids, section_scores)):
+        best = bounds[i] + int(np.argmax(passage_scores[bounds[i]:bounds[i + 1]]))
+        candidates.append((float(passage_scores[best]), float(section_score), i, int(section_id), int(passage_ids[best])))
+
+    # Sections with the best matching passage first, then by section score
+    candidates.sort(key=lambda item: (-item[0], -item[1], item[2]))
+    return [(section_id, passage_score, passage_id) for passage_score, _, _, section_id, passage_id in candidates[:top_k]]
+
+def rank_hierarchical(persona, job, docs_text, top_k=5, top_docs=3, top_sections=10, passage_words=80):
+    """
+    Rank sections and pick their best passages with two-stage retrieval.
+
+    Args:
+        persona (str): User persona
+        job (str): Job to be done
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        top_k (int): Number of sections to return
+        top_docs (int): Documents kept after the first stage
+        top_sections (int): Sections kept after the second stage
+        passage_words (int): Number of words per passage
+
+    Returns:
+        tuple: (ranked_sections, subsections) in the format of rank_sections and extract_subsections
+    """
+    index = build_hierarchy(docs_text, passage_words=passage_words)
+    if index is None:
+        return [], []
+
+    ranked_sections = []
+    subsections = []
+    for section_id, score, passage_id in search_hierarchy(index, build_query(persona, job), top_docs, top_sections, top_k):
+        section = index['sections'][section_id]
+        passage_text = index['passages'][passage_id]['text']
+        if passage_text.startswith(section['section_title']):
+            passage_text = passage_text[len(section['section_title']):].strip()
+        ranked_sections.append({
+            'document': section['document'],
+            'page': section['page'],
+            'section_title': section['section_title'],
+            'importance_rank': len(ranked_sections) + 1,
+            'relevance_score': score
+        })
+        subsections.append({
+            'document': section['document'],
+            'page': section['page'],
+            'refined_text': f"From '{section['document']}' - {section['section_title']}: " + passage_text
+        })
+
+    return ranked_sections, subsections
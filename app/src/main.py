@@ -2,8 +2,9 @@ import os
 import json
 import sys
 import time
-from utils import extract_all_pdfs
+from utils import extract_all_pdfs_isolated
 from processor import process_documents
+from corpus import load_or_build_corpus
 
 def print_welcome():
     """Display a friendly welcome message"""
@@ -79,6 +80,14 @@ def main():
         persona_file = os.path.join(app_dir, 'persona.json')
         print_progress("📄 Using default settings from persona.json")
     
+    store_path = None
+    if '--store' in sys.argv:
+        position = sys.argv.index('--store') + 1
+        if position == len(sys.argv) or sys.argv[position].startswith('--'):
+            print("❌ --store needs the path of a corpus database, e.g. --store corpus.db")
+            return
+        store_path = sys.argv[position]
+    
     persona, job, documents_list = load_persona(persona_file)
     if not persona or not job:
         print("❌ I need both a persona and job description to help you effectively.")
@@ -98,10 +107,35 @@ def main():
         return
     
     print_progress(f"📚 Found {len(pdf_files)} PDF files to analyze...")
-    docs_text = extract_all_pdfs(input_dir)
-    
-    print_progress("🔍 Analyzing your documents...")
-    result = process_documents(persona, job, docs_text)
+    if '--two-pass' in sys.argv:
+        # Headings first, then full text only for the pages that look relevant
+        from two_pass import extract_two_pass
+        docs_text, quarantined = extract_two_pass(input_dir, persona, job)
+    else:
+        docs_text, quarantined = extract_all_pdfs_isolated(input_dir)
+    for item in quarantined:
+        print(f"⚠️ Skipping {item['filename']}: {item['reason']}")
+    
+    if store_path:
+        # Persist the pages, then rank from the database; only the top pages are read back
+        from store import open_store, store_documents, process_store
+        conn = open_store(store_path)
+        try:
+            store_documents(conn, docs_text)
+        finally:
+            conn.close()
+        del docs_text
+        
+        print_progress("🔍 Analyzing your documents...")
+        result = process_store(persona, job, store_path)
+    else:
+        # Tokenize once (or reuse the cached token ids of the same pages); scorers share the corpus
+        corpus = load_or_build_corpus(docs_text, os.path.join(base_dir, 'cache', 'corpus'))
+        
+        print_progress("🔍 Analyzing your documents...")
+        result = process_documents(persona, job, docs_text, corpus=corpus)
+    if quarantined:
+        result['metadata']['quarantined_documents'] = quarantined
     
     with open(persona_file, 'r') as f:
         persona_data = json.load(f)
@@ -113,7 +147,14 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        if '--watch' in sys.argv:
+            from scheduler import run_scheduler
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            print_welcome()
+            print("👀 Watching the input folder for new jobs (Ctrl+C to stop)...")
+            run_scheduler(os.path.join(base_dir, 'input'), os.path.join(base_dir, 'output'))
+        else:
+            main()
     except KeyboardInterrupt:
         print("\n\n👋 Okay, stopping here! See you next time!")
     except Exception as e:
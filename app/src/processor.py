@@ -1,8 +1,21 @@
 import re
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer, TfidfTransformer, ENGLISH_STOP_WORDS
 from datetime import datetime
+from similarity import top_k_similarity
+
+# Pattern to match section titles (uppercase words, numbered sections, etc.)
+SECTION_PATTERNS = [
+    r'^\s*([A-Z][A-Z\s]+)\s*$',  # ALL CAPS
+    r'^\s*(\d+\.\s+[A-Za-z\s]+)\s*$',  # Numbered sections
+    r'^\s*([A-Z][a-z]+\s+[A-Za-z\s]+:)\s*$',  # Title case with colon
+    r'^\s*(Form[s]?\s+[A-Za-z\s]+)\s*$',  # Form-related titles
+    r'^\s*(Fillable\s+[A-Za-z\s]+)\s*$',  # Fillable form-related titles
+    r'^\s*(Creating\s+[A-Za-z\s]+\s+Form[s]?)\s*$',  # Creating forms
+    r'^\s*(Managing\s+[A-Za-z\s]+\s+Form[s]?)\s*$',  # Managing forms
+    r'^\s*(How\s+to\s+[A-Za-z\s]+\s+Form[s]?)\s*$'  # How-to guides for forms
+]
 
 def identify_sections(text):
     """
@@ -14,54 +27,86 @@ def identify_sections(text):
     Returns:
         list: List of identified section titles
     """
-    # Pattern to match section titles (uppercase words, numbered sections, etc.)
-    patterns = [
-        r'^\s*([A-Z][A-Z\s]+)\s*$',  # ALL CAPS
-        r'^\s*(\d+\.\s+[A-Za-z\s]+)\s*$',  # Numbered sections
-        r'^\s*([A-Z][a-z]+\s+[A-Za-z\s]+:)\s*$',  # Title case with colon
-        r'^\s*(Form[s]?\s+[A-Za-z\s]+)\s*$',  # Form-related titles
-        r'^\s*(Fillable\s+[A-Za-z\s]+)\s*$',  # Fillable form-related titles
-        r'^\s*(Creating\s+[A-Za-z\s]+\s+Form[s]?)\s*$',  # Creating forms
-        r'^\s*(Managing\s+[A-Za-z\s]+\s+Form[s]?)\s*$',  # Managing forms
-        r'^\s*(How\s+to\s+[A-Za-z\s]+\s+Form[s]?)\s*$'  # How-to guides for forms
-    ]
+    return [title for title, _, _ in identify_sections_with_offsets(text)]
+
+def identify_sections_with_offsets(text):
+    """
+    Identify section titles and the span of text each one covers.
     
-    section_titles = []
-    lines = text.split('\n')
+    A section runs from the start of its title line to the start of the
+    next section title on the page (or the end of the page).
     
-    for line in lines:
-        line = line.strip()
-        if not line:
+    Args:
+        text (str): Text content to analyze
+        
+    Returns:
+        list: List of (section_title, start, end) tuples with character offsets into text
+    """
+    sections = []
+    offset = 0
+    
+    for line in text.split('\n'):
+        line_start = offset
+        offset += len(line) + 1
+        
+        stripped = line.strip()
+        if not stripped:
             continue
             
-        for pattern in patterns:
-            matches = re.findall(pattern, line)
+        for pattern in SECTION_PATTERNS:
+            matches = re.findall(pattern, stripped)
             if matches:
-                section_titles.extend(matches)
+                start = line_start + line.index(stripped)
+                sections.extend((match, start) for match in matches)
                 break
     
-    return section_titles
+    return [
+        (title, start, sections[i + 1][1] if i + 1 < len(sections) else len(text))
+        for i, (title, start) in enumerate(sections)
+    ]
+
+# Same token rules as TfidfVectorizer(stop_words='english')
+TOKEN_PATTERN = re.compile(r'(?u)\b\w\w+\b')
 
-def rank_sections(persona, job, docs_text):
+def tokenize(text):
     """
-    Rank sections based on relevance to persona and job.
+    Split text into lowercase terms, dropping English stop words.
+    
+    Args:
+        text (str): Text to tokenize
+        
+    Returns:
+        list: List of terms
+    """
+    return [term for term in TOKEN_PATTERN.findall(text.lower()) if term not in ENGLISH_STOP_WORDS]
+
+def build_query(persona, job):
+    """
+    Build the search query for a persona and job.
     
     Args:
         persona (str): User persona
         job (str): Job to be done
-        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
         
     Returns:
-        list: List of dictionaries containing ranked sections
+        str: Query text
     """
     # For HR professionals looking for form creation, add some relevant keywords
     if "HR" in persona and "form" in job.lower():
-        query = f"{persona} {job} fillable forms PDF forms create edit manage onboarding compliance"
-    else:
-        query = f"{persona} {job}"
+        return f"{persona} {job} fillable forms PDF forms create edit manage onboarding compliance"
+    return f"{persona} {job}"
+
+def collect_page_sections(docs_text):
+    """
+    Identify the sections on every page.
+    
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
         
-    text_corpus = [query]
-    metadata = []
+    Returns:
+        list: List of (filename, page_num, text, sections) tuples for pages with at least one section
+    """
+    pages = []
     
     # Process each document and page
     for filename, content in docs_text.items():
@@ -75,14 +120,42 @@ def rank_sections(persona, job, docs_text):
                 if len(first_line) > 10:  # Ensure it's not too short
                     sections = [first_line[:50] + '...']
             
-            # Add each section to the corpus
-            for section in sections:
-                text_corpus.append(text)
-                metadata.append({
-                    'document': filename,
-                    'page': page_num,
-                    'section_title': section
-                })
+            if sections:
+                pages.append((filename, page_num, text, sections))
+    
+    return pages
+
+def rank_sections(persona, job, docs_text, top_k=5, corpus=None):
+    """
+    Rank sections based on relevance to persona and job.
+    
+    Args:
+        persona (str): User persona
+        job (str): Job to be done
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        top_k (int): Number of sections to return
+        corpus (dict): Tokenized corpus of docs_text from corpus.build_corpus (optional)
+        
+    Returns:
+        list: List of dictionaries containing ranked sections
+    """
+    query = build_query(persona, job)
+    
+    if corpus is not None:
+        return _rank_sections_tokenized(query, corpus, top_k)
+        
+    text_corpus = [query]
+    metadata = []
+    
+    # Add each section to the corpus
+    for filename, page_num, text, sections in collect_page_sections(docs_text):
+        for section in sections:
+            text_corpus.append(text)
+            metadata.append({
+                'document': filename,
+                'page': page_num,
+                'section_title': section
+            })
     
     # If no sections were found, return empty list
     if len(text_corpus) <= 1:
@@ -92,27 +165,48 @@ def rank_sections(persona, job, docs_text):
     vectorizer = TfidfVectorizer(stop_words='english')
     try:
         tfidf_matrix = vectorizer.fit_transform(text_corpus)
-        scores = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()
+        # TF-IDF rows are already L2-normalized
+        indices, scores = top_k_similarity(tfidf_matrix[0:1], tfidf_matrix[1:], k=top_k, normalized=True)
     except Exception as e:
         print(f"Error in TF-IDF calculation: {e}")
         return []
     
-    # Combine scores with metadata
+    return _combine_ranked(indices[0], scores[0], metadata)
+
+def _rank_sections_tokenized(query, corpus, top_k):
+    """TF-IDF ranking built straight from the token-id arrays of a tokenized corpus"""
+    from corpus import page_counts, query_counts
+    
+    section_pages = corpus['section_pages']
+    if not len(section_pages):
+        return []
+    
+    # One row per section holding its page's counts, as in the text path
+    query_row = query_counts(corpus, query)
+    section_rows = page_counts(corpus, query_row.shape[1])[section_pages]
+    tfidf_matrix = TfidfTransformer().fit_transform(sp.vstack([query_row, section_rows]).tocsr())
+    indices, scores = top_k_similarity(tfidf_matrix[0:1], tfidf_matrix[1:], k=top_k, normalized=True)
+    
+    metadata = [
+        {
+            'document': corpus['pages'][page][0],
+            'page': corpus['pages'][page][1],
+            'section_title': title
+        } for page, title in zip(section_pages, corpus['section_titles'])
+    ]
+    return _combine_ranked(indices[0], scores[0], metadata)
+
+def _combine_ranked(indices, scores, metadata):
+    """Turn top-k indices and scores into ranked section dictionaries"""
+    # Combine scores with metadata (already sorted by relevance score, descending)
     ranked_sections = []
-    for i, score in enumerate(scores):
-        section_data = metadata[i].copy()
+    for i, (index, score) in enumerate(zip(indices, scores)):
+        section_data = metadata[index].copy()
         section_data['importance_rank'] = i + 1
         section_data['relevance_score'] = float(score)
         ranked_sections.append(section_data)
     
-    # Sort by relevance score (descending)
-    ranked_sections = sorted(ranked_sections, key=lambda x: x['relevance_score'], reverse=True)
-    
-    # Update importance rank after sorting
-    for i, section in enumerate(ranked_sections):
-        section['importance_rank'] = i + 1
-    
-    return ranked_sections[:5]  # Return top 5 sections
+    return ranked_sections
 
 def extract_subsections(docs_text, ranked_sections):
     """
@@ -168,7 +262,33 @@ def extract_subsections(docs_text, ranked_sections):
     
     return subsections
 
-def process_documents(persona, job, docs_text):
+# Scorers whose ranking function accepts a tokenized corpus
+CORPUS_SCORERS = ('tfidf', 'bm25')
+
+def get_ranker(scorer):
+    """
+    Look up the section ranking function for a scorer name.
+    
+    Args:
+        scorer (str): Scorer name ('tfidf', 'bm25', 'hashing' or 'sharded')
+        
+    Returns:
+        callable: Function taking (persona, job, docs_text, top_k=...) and returning ranked sections
+    """
+    if scorer == 'tfidf':
+        return rank_sections
+    if scorer == 'bm25':
+        from bm25 import rank_sections_bm25
+        return rank_sections_bm25
+    if scorer == 'hashing':
+        from hashing import rank_sections_hashing
+        return rank_sections_hashing
+    if scorer == 'sharded':
+        from shards import rank_sections_sharded
+        return rank_sections_sharded
+    raise ValueError(f"Unknown scorer: {scorer}")
+
+def process_documents(persona, job, docs_text, scorer='tfidf', top_k=5, dedup=False, corpus=None, scorer_options=None):
     """
     Process documents and generate analysis based on persona and job.
     
@@ -176,6 +296,11 @@ def process_documents(persona, job, docs_text):
         persona (str): User persona
         job (str): Job to be done
         docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        scorer (str): Ranking backend, 'tfidf', 'bm25', 'hashing', 'sharded' or 'hierarchical'
+        top_k (int): Number of sections to return
+        dedup (bool): Strip boilerplate lines and collapse near-duplicate pages before ranking
+        corpus (dict): Tokenized corpus of docs_text, used by the 'tfidf' and 'bm25' scorers (optional)
+        scorer_options (dict): Extra keyword arguments for the scorer (e.g. {'passage_words': 40})
         
     Returns:
         dict: Analysis results
@@ -183,12 +308,56 @@ def process_documents(persona, job, docs_text):
     # Get document filenames
     documents = list(docs_text.keys())
     
-    # Rank sections by relevance
-    ranked_sections = rank_sections(persona, job, docs_text)
+    duplicates = {}
+    if dedup:
+        from dedup import deduplicate_pages
+        docs_text, duplicates = deduplicate_pages(docs_text)
+        # The tokenized corpus no longer matches the deduplicated pages
+        corpus = None
     
-    # Extract subsections
-    subsections = extract_subsections(docs_text, ranked_sections)
+    options = dict(scorer_options or {})
+    if scorer == 'hierarchical':
+        # Coarse-to-fine retrieval picks the passages itself
+        from hierarchy import rank_hierarchical
+        ranked_sections, subsections = rank_hierarchical(persona, job, docs_text, top_k=top_k, **options)
+    else:
+        # Only some scorers can reuse the tokenized corpus; the others vectorize the text themselves
+        if corpus is not None and scorer in CORPUS_SCORERS:
+            options['corpus'] = corpus
+        
+        # Rank sections by relevance
+        ranked_sections = get_ranker(scorer)(persona, job, docs_text, top_k=top_k, **options)
+        
+        # Extract subsections
+        subsections = extract_subsections(docs_text, ranked_sections)
     
+    result = build_result(persona, job, documents, ranked_sections, subsections)
+    
+    if duplicates:
+        result['metadata']['duplicate_pages'] = [
+            {
+                'document': duplicate[0],
+                'page_number': duplicate[1],
+                'duplicate_of': {'document': kept[0], 'page_number': kept[1]}
+            } for kept, replaced in duplicates.items() for duplicate in replaced
+        ]
+    
+    return result
+
+def build_result(persona, job, documents, ranked_sections, subsections):
+    """
+    Assemble the analysis output from ranked sections and subsections.
+    
+    Args:
+        persona (str): User persona
+        job (str): Job to be done
+        documents (list): Input document filenames
+        ranked_sections (list): List of ranked sections
+        subsections (list): List of subsection analyses
+        
+    Returns:
+        dict: Analysis results
+    """
     # Create result dictionary
     result = {
         'metadata': {
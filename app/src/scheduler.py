@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from utils import extract_text_from_pdf, run_isolated
+from processor import process_documents
+from main import load_persona, save_output
+
+STATE_FILE = '.scheduler_state.json'
+
+def scan_input(input_dir):
+    """
+    List the persona configs and PDFs in a directory with one scandir pass.
+
+    Args:
+        input_dir (str): Input directory path
+
+    Returns:
+        tuple: (configs, pdfs) dictionaries with filename as key and (mtime_ns, size) as value
+    """
+    configs = {}
+    pdfs = {}
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            name = entry.name.lower()
+            if name.endswith('.json'):
+                configs[entry.name] = _version(entry)
+            elif name.endswith('.pdf'):
+                pdfs[entry.name] = _version(entry)
+    return configs, pdfs
+
+def _version(entry):
+    """Identify a file version by its modification time and size"""
+    stat = entry.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+def settled_files(files, previous):
+    """
+    Keep the files whose version did not change since the previous scan.
+
+    A file that is still being copied into the input directory changes
+    size or modification time between scans, so it is left out until it settles.
+
+    Args:
+        files (dict): Files from the current scan_input, with filename as key and (mtime_ns, size) as value
+        previous (dict): The same files from the previous scan
+
+    Returns:
+        dict: The settled subset of files
+    """
+    return {name: version for name, version in files.items() if previous.get(name) == version}
+
+def job_record(version, filenames, pdfs):
+    """
+    Describe the inputs a job ran on, for the state file.
+
+    Args:
+        version (tuple): (mtime_ns, size) of the persona config
+        filenames (list): PDF filenames used by the job
+        pdfs (dict): PDF versions from scan_input
+
+    Returns:
+        dict: Record with the config mtime_ns under 'config' and PDF versions under 'pdfs'
+    """
+    return {'config': version[0], 'pdfs': {filename: list(pdfs[filename]) for filename in filenames}}
+
+def is_current(record, version, pdfs):
+    """Check that a job record still matches the config and every PDF it used"""
+    return (
+        record is not None and record['config'] == version[0]
+        and all(list(pdfs.get(filename, ())) == pdf_version for filename, pdf_version in record['pdfs'].items())
+    )
+
+def load_state(state_path):
+    """
+    Load the finished-job record written by a previous run.
+
+    Args:
+        state_path (str): Path to the state file
+
+    Returns:
+        dict: Dictionary with config filename as key and its job_record as value
+    """
+    try:
+        with open(state_path, 'r') as f:
+            completed = json.load(f).get('completed', {})
+    except (OSError, ValueError):
+        return {}
+    # Older state files only stored the config mtime_ns
+    return {
+        name: record if isinstance(record, dict) else {'config': record, 'pdfs': {}}
+        for name, record in completed.items()
+    }
+
+def save_state(state_path, completed):
+    """
+    Atomically write the finished-job record.
+
+    Args:
+        state_path (str): Path to the state file
+        completed (dict): Dictionary with config filename as key and its job_record as value
+    """
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'completed': completed}, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+class ExtractionCache:
+    """
+    Share PDF extraction between jobs: each PDF version is extracted once, even by concurrent jobs.
+
+    Extraction runs in a child process with a time and memory limit, like
+    extract_all_pdfs_isolated. Entries are kept only while a queued or
+    running job holds a reference to them.
+    """
+
+    def __init__(self, timeout=60, max_memory_mb=1024):
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.refs = {}
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+
+    def acquire(self, keys):
+        """Keep the given (pdf_path, version) entries cached until they are released"""
+        with self.lock:
+            for key in keys:
+                self.refs[key] = self.refs.get(key, 0) + 1
+
+    def release(self, keys):
+        """Drop a reference to each entry, evicting entries no other job needs"""
+        with self.lock:
+            for key in keys:
+                self.refs[key] -= 1
+                if not self.refs[key]:
+                    del self.refs[key]
+                    self.futures.pop(key, None)
+
+    def get(self, pdf_path, version):
+        """Return (pages, None) for a PDF, or (None, reason) if it could not be extracted"""
+        key = (pdf_path, version)
+        with self.lock:
+            future = self.futures.get(key)
+            owner = future is None
+            if owner:
+                future = self.futures[key] = Future()
+
+        if owner:
+            try:
+                results, failures = run_isolated(
+                    [(pdf_path, extract_text_from_pdf, (pdf_path,))],
+                    timeout=self.timeout, max_memory_mb=self.max_memory_mb
+                )
+                future.set_result((results.get(pdf_path), failures.get(pdf_path)))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+def job_documents(documents_list, pdfs):
+    """
+    Work out which PDFs a job needs.
+
+    Args:
+        documents_list (list): Documents listed in the persona config
+        pdfs (dict): PDFs currently in the input directory
+
+    Returns:
+        list: PDF filenames for the job, or None while some listed PDFs have not arrived yet
+    """
+    wanted = [doc.get('filename', '') for doc in documents_list if doc.get('filename')]
+    if not wanted:
+        return sorted(pdfs)
+    if any(filename not in pdfs for filename in wanted):
+        return None
+    return wanted
+
+def run_job(config_path, filenames, input_dir, output_dir, pdfs, cache, scorer='tfidf'):
+    """
+    Analyze the PDFs for one persona config and save the result.
+
+    Args:
+        config_path (str): Path to the persona JSON
+        filenames (list): PDF filenames to analyze
+        input_dir (str): Input directory path
+        output_dir (str): Output directory path
+        pdfs (dict): PDF versions from scan_input
+        cache (ExtractionCache): Shared extraction cache
+        scorer (str): Ranking backend passed to process_documents
+    """
+    persona, job, _ = load_persona(config_path)
+    if not persona or not job:
+        raise ValueError("persona or job description missing")
+
+    docs_text = {}
+    quarantined = []
+    for filename in filenames:
+        pages, reason = cache.get(os.path.join(input_dir, filename), pdfs[filename])
+        if reason is None:
+            docs_text[filename] = pages
+        else:
+            print(f"⚠️ Skipping {filename}: {reason}")
+            quarantined.append({'filename': filename, 'reason': reason})
+
+    result = process_documents(persona, job, docs_text, scorer=scorer)
+    if quarantined:
+        result['metadata']['quarantined_documents'] = quarantined
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    if 'challenge_info' in config:
+        result['metadata']['challenge_info'] = config['challenge_info']
+
+    save_output(result, output_dir)
+
+def run_scheduler(input_dir, output_dir, poll_interval=5.0, max_workers=2, once=False, scorer='tfidf'):
+    """
+    Watch the input directory and process every new or changed persona config.
+
+    Configs and PDFs are only used once their size and modification time
+    are the same in two consecutive scans, so files still being copied in
+    are not read half-written. Finished jobs are recorded in the output
+    directory with the versions of the PDFs they used: a restart only picks
+    up configs that were not processed yet, and a job runs again when one
+    of its PDFs changes.
+
+    Args:
+        input_dir (str): Input directory path
+        output_dir (str): Output directory path
+        poll_interval (float): Seconds between directory scans
+        max_workers (int): Maximum number of jobs running at once
+        once (bool): Stop once every config currently ready has been processed
+        scorer (str): Ranking backend passed to process_documents
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, STATE_FILE)
+    completed = load_state(state_path)
+    failed = {}
+    running = {}
+    # Re-entrant: a job that is already done runs its callback inside add_done_callback
+    lock = threading.RLock()
+    cache = ExtractionCache()
+    previous_configs, previous_pdfs = {}, {}
+
+    def on_done(name, record, keys, future):
+        cache.release(keys)
+        with lock:
+            del running[name]
+            error = future.exception()
+            if error is None:
+                completed[name] = record
+                save_state(state_path, completed)
+                print(f"✅ Finished job {name}")
+            else:
+                failed[name] = record
+                print(f"❌ Job {name} failed: {error}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            configs, pdfs = scan_input(input_dir)
+            stable_configs = settled_files(configs, previous_configs)
+            stable_pdfs = settled_files(pdfs, previous_pdfs)
+            previous_configs, previous_pdfs = configs, pdfs
+            settling = len(stable_configs) < len(configs)
+
+            with lock:
+                waiting = False
+                for name, version in sorted(stable_configs.items()):
+                    if name in running or is_current(completed.get(name), version, pdfs) or is_current(failed.get(name), version, pdfs):
+                        continue
+
+                    config_path = os.path.join(input_dir, name)
+                    _, _, documents_list = load_persona(config_path)
+                    filenames = job_documents(documents_list, pdfs)
+                    if not filenames:
+                        waiting = True
+                        continue
+                    if any(filename not in stable_pdfs for filename in filenames):
+                        settling = True
+                        continue
+
+                    print(f"📥 Queued job {name} with {len(filenames)} PDFs")
+                    keys = [(os.path.join(input_dir, filename), pdfs[filename]) for filename in filenames]
+                    record = job_record(version, filenames, pdfs)
+                    cache.acquire(keys)
+                    future = executor.submit(run_job, config_path, filenames, input_dir, output_dir, pdfs, cache, scorer)
+                    running[name] = future
+                    future.add_done_callback(lambda f, name=name, record=record, keys=keys: on_done(name, record, keys, f))
+
+                idle = not running
+
+            if once and idle and not settling:
+                if waiting:
+                    print("⏳ Some jobs are still waiting for their PDFs")
+                break
+            time.sleep(0.1 if once else poll_interval)
@@ -0,0 +1,272 @@
+import argparse
+import heapq
+import multiprocessing
+import os
+import sys
+import zlib
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+import numpy as np
+from sklearn.metrics.pairwise import linear_kernel
+from sklearn.preprocessing import normalize
+from processor import build_query, collect_page_sections
+from hashing import DEFAULT_N_FEATURES, make_hashing_vectorizer, vectorize_shard, compute_idf, apply_idf
+
+# Messages are pickled, so the authkey is what keeps strangers from running code on a shard
+AUTHKEY_ENV = 'SHARD_AUTHKEY'
+
+def partition_documents(docs_text, n_shards):
+    """
+    Split documents across shards by a stable hash of their filename.
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        n_shards (int): Number of shards
+
+    Returns:
+        list: List of docs_text dictionaries, one per shard
+    """
+    shards = [{} for _ in range(n_shards)]
+    for filename, content in docs_text.items():
+        shards[zlib.crc32(filename.encode('utf-8')) % n_shards][filename] = content
+    return shards
+
+def serve_shard(listener, docs_text, n_features=DEFAULT_N_FEATURES):
+    """
+    Answer coordinator requests for one shard until told to shut down.
+
+    Requests are tuples whose first item is the command:
+    ('stats',), ('idf', idf), ('search', query, top_k) or ('shutdown',).
+    Replies are ('ok', payload) or ('error', message).
+
+    Args:
+        listener (multiprocessing.connection.Listener): Listening socket
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        n_features (int): Width of the hashed feature space shared by all shards
+    """
+    pages = collect_page_sections(docs_text)
+    shard = vectorize_shard([text for _, _, text, _ in pages], n_features)
+    vectorizer = make_hashing_vectorizer(n_features)
+    state = {'idf': None, 'matrix': None}
+
+    def handle(message):
+        command = message[0]
+        if command == 'stats':
+            nonzero = np.flatnonzero(shard['doc_freqs'])
+            return nonzero, shard['doc_freqs'][nonzero], shard['n_docs']
+        if command == 'idf':
+            state['idf'] = message[1]
+            state['matrix'] = apply_idf(shard['counts'], state['idf'])
+            return None
+        if command == 'search':
+            if state['matrix'] is None:
+                raise ValueError("IDF has not been set on this shard")
+            _, query, top_k = message
+            query_vector = normalize(vectorizer.transform([query]).multiply(state['idf']).tocsr())
+            scores = linear_kernel(query_vector, state['matrix']).ravel() if pages else []
+            return _top_sections(pages, scores, top_k)
+        if command == 'shutdown':
+            return None
+        raise ValueError(f"Unknown command: {command}")
+
+    while True:
+        try:
+            conn = listener.accept()
+        except (AuthenticationError, OSError):
+            # A client with the wrong authkey must not take the shard down
+            continue
+        with conn:
+            while True:
+                # A client that disconnects mid-request only ends its own connection
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                try:
+                    reply = ('ok', handle(message))
+                except Exception as e:
+                    reply = ('error', str(e))
+
+                try:
+                    conn.send(reply)
+                except OSError:
+                    break
+                if reply[0] == 'ok' and message[0] == 'shutdown':
+                    return
+
+def _top_sections(pages, scores, top_k):
+    """Expand page scores to sections and keep the shard-local top-k"""
+    ranked_sections = []
+    for (filename, page_num, _, sections), score in zip(pages, scores):
+        for section in sections:
+            ranked_sections.append({
+                'document': filename,
+                'page': page_num,
+                'section_title': section,
+                'relevance_score': float(score)
+            })
+    return sorted(ranked_sections, key=_merge_key)[:top_k]
+
+def _merge_key(section):
+    """Sort key used both inside shards and when merging their results"""
+    return (-section['relevance_score'], section['document'], section['page'])
+
+def _run_local_shard(docs_text, authkey, n_features, ready):
+    """Entry point of a local shard process"""
+    with Listener(('127.0.0.1', 0), authkey=authkey) as listener:
+        ready.send(listener.address)
+        ready.close()
+        serve_shard(listener, docs_text, n_features)
+
+def start_local_shards(docs_text, n_shards, n_features=DEFAULT_N_FEATURES):
+    """
+    Partition the corpus and start one shard server process per partition.
+
+    Args:
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        n_shards (int): Number of shard processes
+        n_features (int): Width of the hashed feature space
+
+    Returns:
+        tuple: (shards, authkey) where shards is a list of (process, address) tuples and
+            authkey is the random secret generated for this run's connections
+    """
+    authkey = os.urandom(32)
+    shards = []
+    for shard_docs in partition_documents(docs_text, n_shards):
+        parent_end, child_end = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_run_local_shard,
+            args=(shard_docs, authkey, n_features, child_end),
+            daemon=True
+        )
+        process.start()
+        child_end.close()
+        shards.append((process, parent_end.recv()))
+        parent_end.close()
+    return shards, authkey
+
+def _request(connections, message):
+    """Send a message to every shard, then collect all replies"""
+    for conn in connections:
+        conn.send(message)
+
+    replies = []
+    for conn in connections:
+        status, payload = conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f"Shard request {message[0]} failed: {payload}")
+        replies.append(payload)
+    return replies
+
+def connect_shards(addresses, authkey, n_features=DEFAULT_N_FEATURES):
+    """
+    Connect to shard servers and give them all the same global IDF.
+
+    Args:
+        addresses (list): List of (host, port) shard addresses
+        authkey (bytes): Shared secret for the shard connections
+        n_features (int): Width of the hashed feature space
+
+    Returns:
+        list: List of open shard connections
+    """
+    connections = [Client(tuple(address), authkey=authkey) for address in addresses]
+
+    doc_freqs = np.zeros(n_features, dtype=np.int64)
+    n_docs = 0
+    for indices, counts, shard_docs in _request(connections, ('stats',)):
+        doc_freqs[indices] += counts
+        n_docs += shard_docs
+
+    _request(connections, ('idf', compute_idf(doc_freqs, n_docs)))
+    return connections
+
+def search_shards(connections, query, top_k=5):
+    """
+    Scatter a query to all shards and merge their local top-k into a global top-k.
+
+    Args:
+        connections (list): List of shard connections from connect_shards
+        query (str): Query text
+        top_k (int): Number of sections to return
+
+    Returns:
+        list: List of dictionaries containing ranked sections
+    """
+    replies = _request(connections, ('search', query, top_k))
+
+    ranked_sections = []
+    for section in heapq.merge(*replies, key=_merge_key):
+        if len(ranked_sections) == top_k:
+            break
+        section['importance_rank'] = len(ranked_sections) + 1
+        ranked_sections.append(section)
+    return ranked_sections
+
+def stop_shards(connections, processes=()):
+    """
+    Shut down shard servers and close their connections.
+
+    Args:
+        connections (list): List of shard connections
+        processes (iterable): Local shard processes to wait for
+    """
+    for conn in connections:
+        try:
+            conn.send(('shutdown',))
+            conn.recv()
+        except (EOFError, OSError):
+            pass
+        conn.close()
+
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+def rank_sections_sharded(persona, job, docs_text, top_k=5, n_shards=2):
+    """
+    Rank sections with scatter-gather search over local shard processes.
+
+    Args:
+        persona (str): User persona
+        job (str): Job to be done
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+        top_k (int): Number of sections to return
+        n_shards (int): Number of shard processes
+
+    Returns:
+        list: List of dictionaries containing ranked sections
+    """
+    shards, authkey = start_local_shards(docs_text, n_shards)
+    connections = []
+    try:
+        connections = connect_shards([address for _, address in shards], authkey)
+        return search_shards(connections, build_query(persona, job), top_k=top_k)
+    finally:
+        stop_shards(connections, [process for process, _ in shards])
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one shard of the PDF corpus over a socket.")
+    parser.add_argument('input_dir', help="Directory with this shard's PDF files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6000)
+    args = parser.parse_args()
+
+    authkey = os.environ.get(AUTHKEY_ENV, '')
+    if not authkey:
+        print(f"❌ Set {AUTHKEY_ENV} to a shared secret before starting a shard server.")
+        sys.exit(1)
+    authkey = authkey.encode()
+
+    from utils import extract_all_pdfs
+
+    docs_text = extract_all_pdfs(args.input_dir)
+    with Listener((args.host, args.port), authkey=authkey) as listener:
+        print(f"📡 Serving {len(docs_text)} documents on {listener.address}")
+        serve_shard(listener, docs_text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+def _score_block(queries, block, offset, k, normalized, dtype):
+    """Score one row block and return its local top-k as (indices, scores)"""
+    if dtype is not None:
+        block = block.astype(dtype, copy=False)
+    if not normalized:
+        block = normalize(block)
+
+    scores = queries @ block.T
+    scores = scores.toarray() if sp.issparse(scores) else np.asarray(scores)
+
+    # Stable sort so that equal scores keep the lower row index first
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return order + offset, np.take_along_axis(scores, order, axis=1)
+
+def _merge_top_k(indices, scores, block_indices, block_scores, k):
+    """Merge a block's top-k into the running top-k of every query"""
+    indices = np.hstack([indices, block_indices])
+    scores = np.hstack([scores, block_scores])
+    order = np.lexsort((indices, -scores), axis=1)[:, :k]
+    return np.take_along_axis(indices, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+def top_k_similarity(queries, matrix, k=5, block_size=4096, workers=None, normalized=False, dtype=None, use_processes=False):
+    """
+    Cosine similarity top-k of every query against the rows of a matrix, computed in row blocks.
+
+    Only a (queries x block_size) score block and a running (queries x k)
+    top-k are held at any time, so memory stays flat however many rows the
+    matrix has. Blocks are scored in parallel on a thread or process pool.
+
+    Args:
+        queries (array-like or sparse matrix): Query rows
+        matrix (array-like or sparse matrix): Rows to score
+        k (int): Number of results per query
+        block_size (int): Number of matrix rows scored at once
+        workers (int): Pool size (defaults to the number of CPUs)
+        normalized (bool): Rows are already L2-normalized, skip normalizing them
+        dtype (np.dtype): Compute in this dtype (e.g. np.float32), or keep the input dtype
+        use_processes (bool): Use a process pool instead of a thread pool
+
+    Returns:
+        tuple: (indices, scores) arrays of shape (n_queries, min(k, n_rows)), best first
+    """
+    if sp.issparse(matrix):
+        matrix = matrix.tocsr()
+    else:
+        matrix = np.asarray(matrix)
+    if dtype is not None:
+        queries = queries.astype(dtype, copy=False)
+    if not normalized:
+        queries = normalize(queries)
+
+    n_queries = queries.shape[0]
+    n_rows = matrix.shape[0]
+    indices = np.zeros((n_queries, 0), dtype=np.int64)
+    scores = np.zeros((n_queries, 0), dtype=dtype or np.float64)
+    if n_rows == 0 or k <= 0:
+        return indices, scores
+
+    offsets = range(0, n_rows, block_size)
+    blocks = (matrix[offset:offset + block_size] for offset in offsets)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(offsets) == 1:
+        results = (_score_block(queries, block, offset, k, normalized, dtype) for block, offset in zip(blocks, offsets))
+        for block_indices, block_scores in results:
+            indices, scores = _merge_top_k(indices, scores, block_indices, block_scores, k)
+        return indices, scores
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        futures = []
+        for block, offset in zip(blocks, offsets):
+            futures.append(executor.submit(_score_block, queries, block, offset, k, normalized, dtype))
+            # Keep a bounded number of blocks in flight
+            if len(futures) >= 2 * workers:
+                indices, scores = _merge_top_k(indices, scores, *futures.pop(0).result(), k)
+        for future in futures:
+            indices, scores = _merge_top_k(indices, scores, *future.result(), k)
+
+    return indices, scores
@@ -0,0 +1,184 @@
+import sqlite3
+from processor import tokenize, build_query, collect_page_sections, extract_subsections, build_result
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    page_num INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (document_id, page_num)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    page_id INTEGER NOT NULL REFERENCES pages(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_page ON sections(page_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(text, content='pages', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS pages_fts_insert AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_fts_delete AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+def open_store(db_path, timeout=30.0):
+    """
+    Open (and create if needed) a corpus database in WAL mode.
+
+    WAL mode lets several runs read the same database while one of them writes.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        timeout (float): Seconds to wait for another writer's lock
+
+    Returns:
+        sqlite3.Connection: Open connection
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+def store_documents(conn, docs_text):
+    """
+    Save documents, their pages and identified sections, replacing earlier copies.
+
+    Args:
+        conn (sqlite3.Connection): Store connection
+        docs_text (dict): Dictionary with filename as key and list of (page_num, text) as value
+    """
+    page_sections = {
+        (filename, page_num): sections for filename, page_num, _, sections in collect_page_sections(docs_text)
+    }
+
+    with conn:
+        for filename, content in docs_text.items():
+            conn.execute('DELETE FROM documents WHERE filename = ?', (filename,))
+            document_id = conn.execute('INSERT INTO documents (filename) VALUES (?)', (filename,)).lastrowid
+            for page_num, text in content:
+                page_id = conn.execute(
+                    'INSERT INTO pages (document_id, page_num, text) VALUES (?, ?, ?)',
+                    (document_id, page_num, text)
+                ).lastrowid
+                conn.executemany(
+                    'INSERT INTO sections (page_id, position, title) VALUES (?, ?, ?)',
+                    [(page_id, i, title) for i, title in enumerate(page_sections.get((filename, page_num), []))]
+                )
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query matching any of its terms.
+
+    Args:
+        text (str): Query text
+
+    Returns:
+        str: FTS5 MATCH expression, or an empty string if no terms are left
+    """
+    terms = dict.fromkeys(tokenize(text))
+    return ' OR '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+def rank_sections_store(conn, persona, job, top_k=5):
+    """
+    Rank stored sections with the FTS5 bm25 ranking of their pages.
+
+    Args:
+        conn (sqlite3.Connection): Store connection
+        persona (str): User persona
+        job (str): Job to be done
+        top_k (int): Number of sections to return
+
+    Returns:
+        list: List of dictionaries containing ranked sections
+    """
+    match = fts_query(build_query(persona, job))
+    if not match:
+        return []
+
+    # Every page with sections yields at least one, so top_k pages cover top_k sections
+    pages = conn.execute(
+        """
+        SELECT p.id, d.filename, p.page_num, bm25(pages_fts) AS score
+        FROM pages_fts
+        JOIN pages p ON p.id = pages_fts.rowid
+        JOIN documents d ON d.id = p.document_id
+        WHERE pages_fts MATCH ? AND EXISTS (SELECT 1 FROM sections s WHERE s.page_id = p.id)
+        ORDER BY score, p.id
+        LIMIT ?
+        """,
+        (match, top_k)
+    ).fetchall()
+
+    ranked_sections = []
+    for page_id, filename, page_num, score in pages:
+        for (title,) in conn.execute('SELECT title FROM sections WHERE page_id = ? ORDER BY position', (page_id,)):
+            ranked_sections.append({
+                'document': filename,
+                'page': page_num,
+                'section_title': title,
+                'importance_rank': len(ranked_sections) + 1,
+                # FTS5 bm25() is lower-is-better
+                'relevance_score': -score
+            })
+
+    return ranked_sections[:top_k]
+
+def load_pages(conn, locations):
+    """
+    Load the text of specific pages.
+
+    Args:
+        conn (sqlite3.Connection): Store connection
+        locations (iterable): (filename, page_num) tuples
+
+    Returns:
+        dict: Dictionary with filename as key and list of (page_num, text) as value
+    """
+    docs_text = {}
+    for filename, page_num in dict.fromkeys(locations):
+        row = conn.execute(
+            """
+            SELECT p.text FROM pages p JOIN documents d ON d.id = p.document_id
+            WHERE d.filename = ? AND p.page_num = ?
+            """,
+            (filename, page_num)
+        ).fetchone()
+        if row:
+            docs_text.setdefault(filename, []).append((page_num, row[0]))
+    return docs_text
+
+def process_store(persona, job, db_path, top_k=5):
+    """
+    Process documents straight from a corpus database.
+
+    Only the pages of the top-ranked sections are read back into memory.
+
+    Args:
+        persona (str): User persona
+        job (str): Job to be done
+        db_path (str): Path to the SQLite database file
+        top_k (int): Number of sections to return
+
+    Returns:
+        dict: Analysis results
+    """
+    conn = open_store(db_path)
+    try:
+        documents = [filename for (filename,) in conn.execute('SELECT filename FROM documents ORDER BY id')]
+        ranked_sections = rank_sections_store(conn, persona, job, top_k=top_k)
+        docs_text = load_pages(conn, [(section['document'], section['page']) for section in ranked_sections])
+    finally:
+        conn.close()
+
+    subsections = extract_subsections(docs_text, ranked_sections)
+    return build_result(persona, job, documents, ranked_sections, subsections)
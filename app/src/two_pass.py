@@ -0,0 +1,89 @@
+import os
+from sklearn.feature_extraction.text import TfidfVectorizer
+from processor import build_query
+from similarity import top_k_similarity
+from utils import get_pdf_files, scan_pdf_headings, extract_pages, run_isolated
+
+def select_candidate_pages(headings, query, max_pages=20):
+    """
+    Pre-score pages by their heading text and keep the most promising ones.
+
+    Args:
+        headings (dict): Dictionary with filename as key and list of (page_num, heading_text) as value
+        query (str): Query text
+        max_pages (int): Number of pages to keep across all documents
+
+    Returns:
+        dict: Dictionary with filename as key and list of candidate page numbers as value
+    """
+    locations = []
+    texts = [query]
+    for filename, pages in headings.items():
+        for page_num, heading_text in pages:
+            if heading_text.strip():
+                locations.append((filename, page_num))
+                texts.append(heading_text)
+
+    if not locations:
+        return {}
+
+    vectorizer = TfidfVectorizer(stop_words='english')
+    try:
+        matrix = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Only stop words in the headings: nothing to pre-score on
+        return {}
+    indices, _ = top_k_similarity(matrix[0:1], matrix[1:], k=max_pages, normalized=True)
+
+    candidates = {}
+    for index in indices[0]:
+        filename, page_num = locations[index]
+        candidates.setdefault(filename, []).append(page_num)
+    return candidates
+
+def extract_two_pass(input_dir, persona, job, max_pages=20, timeout=60, max_memory_mb=1024, workers=1):
+    """
+    Extract text in two passes: scan headings everywhere, then fully extract only candidate pages.
+
+    Both passes run each PDF in its own process with a time and memory limit,
+    like extract_all_pdfs_isolated; a PDF failing either pass is skipped and reported.
+
+    Args:
+        input_dir (str): Input directory path
+        persona (str): User persona
+        job (str): Job to be done
+        max_pages (int): Number of candidate pages to fully extract across all documents
+        timeout (float): Seconds allowed per document and pass
+        max_memory_mb (int): Extra memory allowed per document, in MB
+        workers (int): Number of documents processed at the same time
+
+    Returns:
+        tuple: (docs_text, quarantined) where quarantined is a list of dictionaries with 'filename' and 'reason'
+    """
+    limits = {'timeout': timeout, 'max_memory_mb': max_memory_mb, 'workers': workers}
+    pdf_files = sorted(get_pdf_files(input_dir))
+
+    scanned, scan_failures = run_isolated(
+        [(pdf_path, scan_pdf_headings, (pdf_path,)) for pdf_path in pdf_files], **limits
+    )
+    headings = {os.path.basename(pdf_path): pages for pdf_path, pages in scanned.items()}
+    candidates = select_candidate_pages(headings, build_query(persona, job), max_pages=max_pages)
+
+    extracted, extract_failures = run_isolated(
+        [
+            (pdf_path, extract_pages, (pdf_path, candidates.get(os.path.basename(pdf_path), [])))
+            for pdf_path in pdf_files if pdf_path in scanned
+        ],
+        **limits
+    )
+
+    docs_text = {}
+    quarantined = []
+    for pdf_path in pdf_files:
+        filename = os.path.basename(pdf_path)
+        if pdf_path in extracted:
+            docs_text[filename] = extracted[pdf_path]
+        else:
+            reason = scan_failures.get(pdf_path) or extract_failures[pdf_path]
+            quarantined.append({'filename': filename, 'reason': reason})
+    return docs_text, quarantined
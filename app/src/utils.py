@@ -1,5 +1,14 @@
 import fitz
 import os
+import shutil
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 def extract_text_from_pdf(pdf_path):
     """
@@ -11,10 +20,77 @@ def extract_text_from_pdf(pdf_path):
     Returns:
         list: List of tuples containing (page_number, page_text)
     """
-    doc = fitz.open(pdf_path)
     all_text = []
-    for i, page in enumerate(doc):
-        all_text.append((i + 1, page.get_text()))
+    with fitz.open(pdf_path) as doc:
+        for i in range(doc.page_count):
+            page = doc.load_page(i)
+            all_text.append((i + 1, page.get_text()))
+            # Release the page before loading the next one
+            del page
+    return all_text
+
+def scan_pdf_headings(pdf_path, head_fraction=0.25):
+    """
+    Cheaply collect heading text per page without extracting full page text.
+    
+    Reads only the text in the top band of each page, where headings usually
+    sit. When the document has an outline (TOC), each page's text is prefixed
+    with the titles of the entries whose page range covers it, i.e. the
+    entries starting on it and the open entry of every outline level above
+    them; the top band still tells apart the pages of one long chapter.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        head_fraction (float): Fraction of the page height read
+        
+    Returns:
+        list: List of tuples containing (page_number, heading_text)
+    """
+    headings = []
+    with fitz.open(pdf_path) as doc:
+        # Entries pointing outside the document are ignored; the stable sort keeps outline order within a page
+        toc = [(level, title, page_num) for level, title, page_num in doc.get_toc(simple=True)
+               if 1 <= page_num <= doc.page_count]
+        toc.sort(key=lambda entry: entry[2])
+        next_entry = 0
+        open_titles = []
+        
+        for i in range(doc.page_count):
+            started = []
+            while next_entry < len(toc) and toc[next_entry][2] == i + 1:
+                level, title, _ = toc[next_entry]
+                del open_titles[level - 1:]
+                open_titles.append(title)
+                started.append(title)
+                next_entry += 1
+            
+            page = doc.load_page(i)
+            rect = page.rect
+            clip = fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * head_fraction)
+            titles = list(dict.fromkeys(open_titles + started))
+            headings.append((i + 1, '\n'.join(titles + [page.get_text(clip=clip)])))
+            del page
+    return headings
+
+def extract_pages(pdf_path, page_numbers):
+    """
+    Extract the full text of selected pages only.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        page_numbers (iterable): 1-based page numbers to extract
+        
+    Returns:
+        list: List of tuples containing (page_number, page_text)
+    """
+    all_text = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in sorted(set(page_numbers)):
+            if not 1 <= page_num <= doc.page_count:
+                continue
+            page = doc.load_page(page_num - 1)
+            all_text.append((page_num, page.get_text()))
+            del page
     return all_text
 
 def get_pdf_files(directory):
@@ -50,4 +126,144 @@ def extract_all_pdfs(input_dir):
         filename = os.path.basename(pdf_file)
         docs_text[filename] = extract_text_from_pdf(pdf_file)
     
-    return docs_text
\ No newline at end of file
+    return docs_text
+
+def _limit_memory(max_memory_mb):
+    """Cap the address space of the current process at its current size plus max_memory_mb"""
+    if resource is None or not max_memory_mb:
+        return
+    
+    current = 0
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        pass
+    
+    limit = current + max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _isolated_worker(func, args, max_memory_mb, conn):
+    """Run one PDF job inside a child process and send the result back"""
+    try:
+        _limit_memory(max_memory_mb)
+        conn.send(('ok', func(*args)))
+    except MemoryError:
+        conn.send(('error', f"exceeded the {max_memory_mb} MB memory limit"))
+    except Exception as e:
+        conn.send(('error', str(e) or e.__class__.__name__))
+    finally:
+        conn.close()
+
+def _isolation_context():
+    """Process start method for isolated jobs: never fork, callers may be multithreaded"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def run_isolated(tasks, timeout=60, max_memory_mb=1024, workers=1, context=None):
+    """
+    Run PDF jobs, each in its own process with a time and memory limit.
+    
+    A job that fails, runs out of memory or exceeds the timeout is reported
+    instead of stopping the others. Children are started with forkserver
+    (or spawn) rather than fork, since forking a process whose other threads
+    hold locks can deadlock the child; func must therefore be importable by name.
+    
+    Args:
+        tasks (list): List of (pdf_path, func, args) tuples; func(*args) runs in the child process
+        timeout (float): Seconds allowed per job
+        max_memory_mb (int): Extra memory allowed per job, in MB
+        workers (int): Number of jobs run at the same time
+        context (multiprocessing.context.BaseContext): Start method context (defaults to forkserver or spawn)
+        
+    Returns:
+        tuple: (results, failures) where results maps pdf_path to the job's return value
+            and failures maps pdf_path to the reason it failed
+    """
+    context = context or _isolation_context()
+    pending = list(tasks)
+    running = {}
+    results = {}
+    failures = {}
+    
+    def finish(conn, reason=None, payload=None):
+        process, pdf_path, _ = running.pop(conn)
+        conn.close()
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        
+        if reason is None:
+            results[pdf_path] = payload
+        else:
+            failures[pdf_path] = reason
+    
+    while pending or running:
+        while pending and len(running) < max(1, workers):
+            pdf_path, func, args = pending.pop(0)
+            parent_conn, child_conn = context.Pipe(duplex=False)
+            process = context.Process(target=_isolated_worker, args=(func, args, max_memory_mb, child_conn), daemon=True)
+            process.start()
+            child_conn.close()
+            running[parent_conn] = (process, pdf_path, time.monotonic() + timeout)
+        
+        next_deadline = min(deadline for _, _, deadline in running.values())
+        for conn in wait(list(running), timeout=max(0, next_deadline - time.monotonic())):
+            try:
+                status, payload = conn.recv()
+            except EOFError:
+                process = running[conn][0]
+                process.join(timeout=1)
+                finish(conn, reason=f"extraction process exited with code {process.exitcode}")
+                continue
+            if status == 'ok':
+                finish(conn, payload=payload)
+            else:
+                finish(conn, reason=payload)
+        
+        now = time.monotonic()
+        for conn, (process, _, deadline) in list(running.items()):
+            if deadline <= now:
+                process.kill()
+                finish(conn, reason=f"timed out after {timeout} seconds")
+    
+    return results, failures
+
+def extract_all_pdfs_isolated(input_dir, timeout=60, max_memory_mb=1024, workers=1, quarantine_dir=None):
+    """
+    Extract text from all PDFs, each in its own process with a time and memory limit.
+    
+    A PDF that fails, runs out of memory or exceeds the timeout is skipped
+    and reported instead of stopping the whole batch.
+    
+    Args:
+        input_dir (str): Input directory path
+        timeout (float): Seconds allowed per document
+        max_memory_mb (int): Extra memory allowed per document, in MB
+        workers (int): Number of documents extracted at the same time
+        quarantine_dir (str): Directory failing PDFs are moved to (optional)
+        
+    Returns:
+        tuple: (docs_text, quarantined) where quarantined is a list of dictionaries with 'filename' and 'reason'
+    """
+    pdf_files = sorted(get_pdf_files(input_dir))
+    results, failures = run_isolated(
+        [(pdf_path, extract_text_from_pdf, (pdf_path,)) for pdf_path in pdf_files],
+        timeout=timeout, max_memory_mb=max_memory_mb, workers=workers
+    )
+    
+    docs_text = {}
+    quarantined = []
+    for pdf_path in pdf_files:
+        filename = os.path.basename(pdf_path)
+        if pdf_path in results:
+            docs_text[filename] = results[pdf_path]
+            continue
+        
+        quarantined.append({'filename': filename, 'reason': failures[pdf_path]})
+        if quarantine_dir:
+            os.makedirs(quarantine_dir, exist_ok=True)
+            shutil.move(pdf_path, os.path.join(quarantine_dir, filename))
+    
+    return docs_text, quarantined
@@ -0,0 +1,52 @@
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from bm25 import build_inverted_index, search, rank_sections_bm25
+
+WORDS = ['form', 'fillable', 'sign', 'onboarding', 'compliance', 'export', 'share', 'edit', 'convert', 'pdf', 'field', 'review']
+
+def brute_force_scores(index, texts, query):
+    """Score every document against the query without any pruning"""
+    scores = []
+    for doc_id in range(len(texts)):
+        score = 0.0
+        for term in query.split():
+            if term not in index['terms']:
+                continue
+            term_id = index['terms'][term]
+            start, end = index['offsets'][term_id], index['offsets'][term_id + 1]
+            docs = list(index['doc_ids'][start:end])
+            if doc_id in docs:
+                tf = index['term_freqs'][start + docs.index(doc_id)]
+                score += index['idf'][term_id] * tf * (index['k1'] + 1) / (tf + index['length_norms'][doc_id])
+        scores.append(score)
+    return scores
+
+def test_search_matches_exhaustive_scoring():
+    rng = random.Random(7)
+    texts = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 40))) for _ in range(200)]
+    index = build_inverted_index(texts)
+    query = 'fillable form onboarding compliance'
+
+    scores = brute_force_scores(index, texts, query)
+    expected = sorted((i for i in range(len(texts)) if scores[i] > 0), key=lambda i: (-scores[i], i))[:10]
+
+    results = search(index, query, top_k=10)
+    assert [doc_id for doc_id, _ in results] == expected
+    for doc_id, score in results:
+        assert abs(score - scores[doc_id]) < 1e-6
+
+def test_rank_sections_bm25_output_format():
+    docs_text = {
+        'forms.pdf': [(1, 'CREATING FORMS\nCreate fillable forms for onboarding.'), (2, 'EXPORTING\nExport a PDF to Word.')],
+        'share.pdf': [(1, 'SHARING\nShare a PDF with reviewers.')]
+    }
+    ranked = rank_sections_bm25('HR professional', 'Create fillable forms', docs_text, top_k=5)
+
+    assert ranked[0]['document'] == 'forms.pdf'
+    assert ranked[0]['page'] == 1
+    assert ranked[0]['section_title'] == 'CREATING FORMS'
+    assert [section['importance_rank'] for section in ranked] == list(range(1, len(ranked) + 1))
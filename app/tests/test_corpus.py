@@ -0,0 +1,104 @@
+import os
+import sys
+import random
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from corpus import build_corpus, save_corpus, load_corpus, save_dictionary, load_dictionary, page_counts, load_or_build_corpus
+from processor import tokenize, identify_sections_with_offsets, rank_sections, process_documents
+from bm25 import rank_sections_bm25
+
+WORDS = ['form', 'fillable', 'sign', 'onboarding', 'compliance', 'export', 'share', 'edit', 'the', 'and', 'pdf']
+TITLES = ['CREATING FORMS', 'EXPORTING', 'SHARING FILES', '1. Getting started']
+
+def make_docs(seed=5):
+    """Random multi-section pages, including one page without sections"""
+    rng = random.Random(seed)
+    docs_text = {}
+    for d in range(4):
+        pages = []
+        for p in range(1, 4):
+            lines = []
+            for title in rng.sample(TITLES, 2):
+                lines.append(title)
+                lines.append(' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 15))))
+            pages.append((p, '\n'.join(lines)))
+        pages.append((4, 'just a plain page of words about forms and export'))
+        docs_text[f'doc_{d}.pdf'] = pages
+    return docs_text
+
+def test_token_arrays_match_text():
+    docs_text = make_docs()
+    corpus = build_corpus(docs_text)
+    id_to_term = {term_id: term for term, term_id in corpus['terms'].items()}
+
+    texts = [text for content in docs_text.values() for _, text in content]
+    offsets = corpus['page_offsets']
+    for i, text in enumerate(texts):
+        assert [id_to_term[t] for t in corpus['tokens'][offsets[i]:offsets[i + 1]]] == tokenize(text)
+
+    first_page = texts[0]
+    (title, start, end) = identify_sections_with_offsets(first_page)[0]
+    section_start, section_end = corpus['section_bounds'][0]
+    assert corpus['section_titles'][0] == title
+    assert [id_to_term[t] for t in corpus['tokens'][section_start:section_end]] == tokenize(first_page[start:end])
+
+def test_scorers_give_same_results_from_corpus():
+    docs_text = make_docs()
+    corpus = build_corpus(docs_text)
+
+    for ranker in (rank_sections, rank_sections_bm25):
+        expected = ranker('HR professional', 'Create fillable forms', docs_text, top_k=8)
+        actual = ranker('HR professional', 'Create fillable forms', docs_text, top_k=8, corpus=corpus)
+        assert [(s['document'], s['page'], s['section_title']) for s in actual] == \
+            [(s['document'], s['page'], s['section_title']) for s in expected]
+        assert np.allclose([s['relevance_score'] for s in actual], [s['relevance_score'] for s in expected])
+
+def test_every_scorer_accepts_a_corpus():
+    docs_text = make_docs()
+    corpus = build_corpus(docs_text)
+
+    for scorer in ('tfidf', 'bm25', 'hashing', 'sharded', 'hierarchical'):
+        result = process_documents('HR professional', 'Create forms', docs_text, scorer=scorer, corpus=corpus)
+        assert result['extracted_sections'], scorer
+
+def test_corpus_and_dictionary_round_trip():
+    docs_text = make_docs()
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(docs_text)
+        save_dictionary(corpus['terms'], os.path.join(tmp, 'terms.json'))
+        save_corpus(corpus, os.path.join(tmp, 'corpus.npz'))
+
+        terms = load_dictionary(os.path.join(tmp, 'terms.json'))
+        loaded = load_corpus(os.path.join(tmp, 'corpus.npz'), terms)
+
+        assert terms == corpus['terms']
+        assert loaded['pages'] == corpus['pages']
+        assert (page_counts(loaded) != page_counts(corpus)).nnz == 0
+
+        # Extending a persisted dictionary keeps existing ids
+        extended = build_corpus({'new.pdf': [(1, 'brand new vocabulary form')]}, terms)
+        assert extended['terms']['form'] == corpus['terms']['form']
+
+def test_corpus_cache_reuses_and_rebuilds_entries():
+    docs_text = make_docs()
+    with tempfile.TemporaryDirectory() as tmp:
+        built = load_or_build_corpus(docs_text, tmp)
+        cached = load_or_build_corpus(docs_text, tmp)
+        assert cached['terms'] == built['terms']
+        assert (page_counts(cached) != page_counts(built)).nnz == 0
+
+        # A truncated entry is rebuilt instead of failing the run
+        npz = [name for name in os.listdir(tmp) if name.endswith('.npz')][0]
+        with open(os.path.join(tmp, npz), 'r+b') as f:
+            f.truncate(10)
+        rebuilt = load_or_build_corpus(docs_text, tmp)
+        assert (page_counts(rebuilt) != page_counts(built)).nnz == 0
+
+        # Only the most recent entries are kept, each with its own dictionary
+        for seed in range(3):
+            load_or_build_corpus(make_docs(seed), tmp, keep=2)
+        assert len(os.listdir(tmp)) == 4
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from dedup import strip_boilerplate, deduplicate_pages
+from processor import process_documents
+
+DISCLAIMER = 'Confidential - for internal HR use only'
+BODY = ('To create an interactive form, open the Prepare Forms tool and select a document. '
+        'Acrobat detects form fields automatically and you can add text fields, checkboxes and signature fields.')
+
+def test_strip_boilerplate_removes_repeated_lines():
+    topics = ['Creating forms', 'Sharing files', 'Exporting pages', 'Requesting signatures']
+    docs_text = {
+        'binder.pdf': [(i, f'{DISCLAIMER}\n{topic}\nPage {i} of 4') for i, topic in enumerate(topics, 1)]
+    }
+    stripped = strip_boilerplate(docs_text)
+
+    for (page_num, text), topic in zip(stripped['binder.pdf'], topics):
+        assert text == topic
+
+def test_deduplicate_pages_keeps_first_location():
+    docs_text = {
+        'a.pdf': [(1, 'CREATING FORMS\n' + BODY), (2, 'EXPORTING\nExport a PDF to Microsoft Word or Excel.')],
+        'b.pdf': [(7, 'CREATING FORMS\n' + BODY + ' ')]
+    }
+    deduplicated, duplicates = deduplicate_pages(docs_text)
+
+    assert deduplicated['a.pdf'] == docs_text['a.pdf']
+    assert deduplicated['b.pdf'] == []
+    assert duplicates == {('a.pdf', 1): [('b.pdf', 7)]}
+
+def test_blank_pages_are_not_duplicates():
+    docs_text = {
+        'a.pdf': [(1, 'CREATING FORMS\n' + BODY), (2, ''), (3, '  \n ')],
+        'b.pdf': [(1, '\n')]
+    }
+    deduplicated, duplicates = deduplicate_pages(docs_text)
+
+    assert duplicates == {}
+    assert [page_num for page_num, _ in deduplicated['a.pdf']] == [1, 2, 3]
+    assert [page_num for page_num, _ in deduplicated['b.pdf']] == [1]
+
+def test_process_documents_reports_duplicates():
+    docs_text = {
+        'a.pdf': [(1, 'CREATING FORMS\n' + BODY)],
+        'b.pdf': [(3, 'CREATING FORMS\n' + BODY)]
+    }
+    result = process_documents('HR professional', 'Create fillable forms', docs_text, dedup=True)
+
+    assert result['metadata']['input_documents'] == ['a.pdf', 'b.pdf']
+    assert [section['document'] for section in result['extracted_sections']] == ['a.pdf']
+    assert result['metadata']['duplicate_pages'] == [
+        {'document': 'b.pdf', 'page_number': 3, 'duplicate_of': {'document': 'a.pdf', 'page_number': 1}}
+    ]
@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from evaluate import ndcg_at_k, recall_at_k, pareto_frontier, run_evaluation
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'relevance')
+
+JUDGMENTS = [
+    {'document': 'a.pdf', 'page_number': 1, 'relevance': 3},
+    {'document': 'b.pdf', 'page_number': 2, 'relevance': 1}
+]
+
+def section(document, page_number, title='TITLE'):
+    return {'document': document, 'page_number': page_number, 'section_title': title}
+
+def test_metrics():
+    perfect = [section('a.pdf', 1), section('b.pdf', 2)]
+    swapped = [section('b.pdf', 2), section('a.pdf', 1)]
+    repeated = [section('a.pdf', 1, 'ONE'), section('a.pdf', 1, 'TWO')]
+
+    assert ndcg_at_k(perfect, JUDGMENTS, 5) == 1.0
+    assert 0 < ndcg_at_k(swapped, JUDGMENTS, 5) < 1.0
+    assert recall_at_k(swapped, JUDGMENTS, 1) == 0.5
+    # A judged page is only credited once
+    assert recall_at_k(repeated, JUDGMENTS, 5) == 0.5
+
+def test_pareto_frontier():
+    reports = pareto_frontier([
+        {'name': 'fast', 'ndcg': 0.7, 'latency_ms': 1.0},
+        {'name': 'good', 'ndcg': 0.9, 'latency_ms': 5.0},
+        {'name': 'worse', 'ndcg': 0.6, 'latency_ms': 6.0}
+    ])
+    assert [report['pareto'] for report in reports] == [True, True, False]
+
+def test_run_evaluation_on_fixtures():
+    variants = [
+        {'name': 'tfidf', 'scorer': 'tfidf'},
+        {'name': 'tfidf-top1', 'scorer': 'tfidf', 'top_k': 1},
+        {'name': 'bm25-corpus', 'scorer': 'bm25', 'corpus': True}
+    ]
+    reports = run_evaluation(FIXTURE_DIR, variants, k=5, repeats=1)
+
+    assert [report['name'] for report in reports] == ['tfidf', 'tfidf-top1', 'bm25-corpus']
+    # Returning fewer sections can only lose recall
+    assert reports[1]['recall'] <= reports[0]['recall']
+    for report in reports:
+        assert (0.0 if report['name'] == 'tfidf-top1' else 0.5) < report['ndcg'] <= 1.0
+        assert 0.0 <= report['recall'] <= 1.0
+        assert report['latency_ms'] > 0
+        assert report['peak_memory_mb'] > 0
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import tempfile
+
+import fitz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils import extract_text_from_pdf, extract_all_pdfs_isolated, run_isolated
+
+def write_pdf(path, pages):
+    """Write a small PDF with one text line per page"""
+    with fitz.open() as doc:
+        for text in pages:
+            page = doc.new_page()
+            page.insert_text((72, 72), text)
+        doc.save(path)
+
+def test_broken_pdf_is_quarantined():
+    with tempfile.TemporaryDirectory() as input_dir:
+        write_pdf(os.path.join(input_dir, 'good.pdf'), ['Creating Forms', 'Sharing'])
+        with open(os.path.join(input_dir, 'broken.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4 this is not really a pdf')
+        quarantine_dir = os.path.join(input_dir, 'quarantine')
+
+        docs_text, quarantined = extract_all_pdfs_isolated(input_dir, timeout=30, workers=2, quarantine_dir=quarantine_dir)
+
+        assert list(docs_text) == ['good.pdf']
+        assert docs_text['good.pdf'] == extract_text_from_pdf(os.path.join(input_dir, 'good.pdf'))
+        assert [item['filename'] for item in quarantined] == ['broken.pdf']
+        assert os.path.exists(os.path.join(quarantine_dir, 'broken.pdf'))
+
+def test_slow_pdf_times_out():
+    with tempfile.TemporaryDirectory() as input_dir:
+        pdf_path = os.path.join(input_dir, 'slow.pdf')
+        write_pdf(pdf_path, ['Creating Forms'])
+
+        # Children are not forked, so the stand-in for a hanging extractor must be importable
+        results, failures = run_isolated([(pdf_path, time.sleep, (60,))], timeout=0.5)
+
+        assert results == {}
+        assert 'timed out' in failures[pdf_path]
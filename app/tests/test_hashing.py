@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from hashing import vectorize_shard, vectorize_parallel, merge_doc_freqs, compute_idf, rank_sections_hashing
+
+TEXTS = [
+    'Create fillable forms for onboarding',
+    'Export a PDF to Word',
+    'Share the PDF form with reviewers',
+    'Request e-signatures on onboarding forms',
+    'Edit text and images in a PDF'
+]
+
+def test_sharded_doc_freqs_match_single_shard():
+    whole = vectorize_shard(TEXTS, n_features=2 ** 10)
+    shards = vectorize_parallel(TEXTS, n_features=2 ** 10, shard_size=2)
+
+    doc_freqs, n_docs = merge_doc_freqs(shards)
+    assert n_docs == len(TEXTS)
+    assert np.array_equal(doc_freqs, whole['doc_freqs'])
+    assert np.allclose(compute_idf(doc_freqs, n_docs), compute_idf(whole['doc_freqs'], whole['n_docs']))
+
+def test_rank_sections_hashing_prefers_matching_page():
+    docs_text = {
+        'forms.pdf': [(1, 'CREATING FORMS\nCreate fillable forms for onboarding.')],
+        'export.pdf': [(1, 'EXPORTING\nExport a PDF to Word.')]
+    }
+    ranked = rank_sections_hashing('HR professional', 'Create fillable forms', docs_text, n_features=2 ** 12)
+
+    assert ranked[0]['document'] == 'forms.pdf'
+    assert ranked[0]['importance_rank'] == 1
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from processor import identify_sections, identify_sections_with_offsets, process_documents
+from hierarchy import build_hierarchy, search_hierarchy
+
+PAGE = 'Intro line\nCREATING FORMS\nUse Prepare Form to add fillable fields.\nEXPORTING\nSave the PDF as Word.'
+
+def test_section_offsets_cover_section_text():
+    spans = identify_sections_with_offsets(PAGE)
+
+    assert [title for title, _, _ in spans] == identify_sections(PAGE)
+    assert PAGE[spans[0][1]:spans[0][2]] == 'CREATING FORMS\nUse Prepare Form to add fillable fields.\n'
+    assert PAGE[spans[1][1]:spans[1][2]] == 'EXPORTING\nSave the PDF as Word.'
+
+def test_hierarchy_prunes_to_best_document():
+    docs_text = {
+        'forms.pdf': [(1, PAGE)],
+        'share.pdf': [(1, 'SHARING\nShare a link with reviewers.'), (2, 'COMMENTS\nReply to comments.')]
+    }
+    index = build_hierarchy(docs_text, passage_words=5)
+
+    assert index['documents'] == ['forms.pdf', 'share.pdf']
+    assert list(index['doc_offsets']) == [0, 2, 4]
+
+    results = search_hierarchy(index, 'fillable form fields', top_docs=1, top_k=2)
+    assert [index['sections'][section_id]['section_title'] for section_id, _, _ in results] == ['CREATING FORMS', 'EXPORTING']
+    assert 'fillable' in index['passages'][results[0][2]]['text']
+
+def test_process_documents_hierarchical_output_format():
+    result = process_documents('HR professional', 'Create fillable forms', {'forms.pdf': [(3, PAGE)]}, scorer='hierarchical')
+
+    assert result['extracted_sections'][0] == {
+        'document': 'forms.pdf', 'section_title': 'CREATING FORMS', 'importance_rank': 1, 'page_number': 3
+    }
+    assert result['subsection_analysis'][0]['refined_text'] == (
+        "From 'forms.pdf' - CREATING FORMS: Use Prepare Form to add fillable fields."
+    )
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import tempfile
+
+import fitz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import scheduler
+from scheduler import run_scheduler, load_state, settled_files, ExtractionCache
+
+def write_config(path, filenames):
+    """Write a persona config in the input/1.json format"""
+    with open(path, 'w') as f:
+        json.dump({
+            'challenge_info': {'challenge_id': os.path.splitext(os.path.basename(path))[0]},
+            'documents': [{'filename': filename} for filename in filenames],
+            'persona': {'role': 'HR professional'},
+            'job_to_be_done': {'task': 'Create and manage fillable forms'}
+        }, f)
+
+def test_scheduler_shares_extraction_and_resumes(monkeypatch):
+    calls = []
+    original = scheduler.run_isolated
+
+    def counting_run_isolated(tasks, **limits):
+        calls.extend(os.path.basename(pdf_path) for pdf_path, _, _ in tasks)
+        return original(tasks, **limits)
+
+    monkeypatch.setattr(scheduler, 'run_isolated', counting_run_isolated)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, 'input')
+        output_dir = os.path.join(tmp, 'output')
+        os.makedirs(input_dir)
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), 'CREATING FORMS')
+            doc.save(os.path.join(input_dir, 'forms.pdf'))
+        with open(os.path.join(input_dir, 'broken.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4 this is not really a pdf')
+        write_config(os.path.join(input_dir, 'a.json'), ['forms.pdf'])
+        write_config(os.path.join(input_dir, 'b.json'), ['forms.pdf', 'broken.pdf'])
+        write_config(os.path.join(input_dir, 'c.json'), ['missing.pdf'])
+
+        run_scheduler(input_dir, output_dir, max_workers=2, once=True)
+
+        outputs = [name for name in os.listdir(output_dir) if name.endswith('.json') and not name.startswith('.')]
+        assert sorted(name.split('_')[0] for name in outputs) == ['a', 'b']
+        assert sorted(calls) == ['broken.pdf', 'forms.pdf']
+        for name in outputs:
+            with open(os.path.join(output_dir, name)) as f:
+                metadata = json.load(f)['metadata']
+            if name.startswith('b'):
+                assert [item['filename'] for item in metadata['quarantined_documents']] == ['broken.pdf']
+            else:
+                assert 'quarantined_documents' not in metadata
+        assert sorted(load_state(os.path.join(output_dir, scheduler.STATE_FILE))) == ['a.json', 'b.json']
+
+        # A restart skips finished jobs
+        run_scheduler(input_dir, output_dir, once=True)
+        assert len(os.listdir(output_dir)) == len(outputs) + 1
+
+        # Replacing a PDF reruns the jobs that used it
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), 'CREATING FORMS AND SIGNATURES')
+            doc.save(os.path.join(input_dir, 'forms.pdf'))
+        run_scheduler(input_dir, output_dir, once=True)
+        assert len(os.listdir(output_dir)) == 2 * len(outputs) + 1
+        state = load_state(os.path.join(output_dir, scheduler.STATE_FILE))
+        assert state['a.json']['pdfs']['forms.pdf'] == list(scheduler.scan_input(input_dir)[1]['forms.pdf'])
+
+def test_settled_files_skips_files_still_being_written():
+    previous = {'done.pdf': (1, 100), 'copying.pdf': (1, 50)}
+    current = {'done.pdf': (1, 100), 'copying.pdf': (2, 80), 'new.pdf': (3, 10)}
+    assert settled_files(current, previous) == {'done.pdf': (1, 100)}
+
+def test_extraction_cache_evicts_unreferenced_pdfs():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'forms.pdf')
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), 'CREATING FORMS')
+            doc.save(pdf_path)
+        key = (pdf_path, (1, 1))
+
+        cache = ExtractionCache()
+        cache.acquire([key])
+        cache.acquire([key])
+        pages, reason = cache.get(*key)
+        assert reason is None and 'CREATING FORMS' in pages[0][1]
+
+        # Still referenced by the second job
+        cache.release([key])
+        assert key in cache.futures
+
+        cache.release([key])
+        assert cache.futures == {} and cache.refs == {}
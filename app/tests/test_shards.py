@@ -0,0 +1,68 @@
+import os
+import sys
+import socket
+import struct
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from hashing import rank_sections_hashing
+from shards import partition_documents, rank_sections_sharded, start_local_shards, connect_shards, search_shards, stop_shards
+
+DOCS_TEXT = {
+    f'doc_{i}.pdf': [
+        (1, f'CREATING FORMS\nCreate fillable forms for onboarding step {i}.' if i % 3 == 0 else 'EXPORTING\nExport a PDF to Word.'),
+        (2, 'SHARING\nShare a PDF with reviewers and request signatures.')
+    ] for i in range(9)
+}
+
+def test_partition_documents_keeps_every_document_once():
+    shards = partition_documents(DOCS_TEXT, 3)
+    filenames = [filename for shard in shards for filename in shard]
+    assert sorted(filenames) == sorted(DOCS_TEXT)
+
+def test_sharded_ranking_matches_single_process():
+    sharded = rank_sections_sharded('HR professional', 'Create fillable forms', DOCS_TEXT, top_k=5, n_shards=3)
+    single = rank_sections_hashing('HR professional', 'Create fillable forms', DOCS_TEXT, top_k=5)
+
+    assert [section['importance_rank'] for section in sharded] == [1, 2, 3, 4, 5]
+    assert [round(s['relevance_score'], 5) for s in sharded] == [round(s['relevance_score'], 5) for s in single]
+    assert {s['document'] for s in sharded[:3]} == {'doc_0.pdf', 'doc_3.pdf', 'doc_6.pdf'}
+
+def test_sharded_ranking_with_empty_shards():
+    docs_text = {'a.pdf': DOCS_TEXT['doc_0.pdf'], 'b.pdf': DOCS_TEXT['doc_1.pdf']}
+    sharded = rank_sections_sharded('HR professional', 'Create fillable forms', docs_text, top_k=3, n_shards=4)
+
+    assert sharded[0]['document'] == 'a.pdf'
+    assert len(sharded) == 3
+
+def test_local_shards_reject_other_authkeys():
+    shards, authkey = start_local_shards(DOCS_TEXT, 1)
+    connections = []
+    try:
+        assert len(authkey) == 32
+        with pytest.raises((AuthenticationError, ConnectionError)):
+            connect_shards([shards[0][1]], b'pdf-assistant-shard')
+        # The shard keeps serving after rejecting the client
+        connections = connect_shards([shards[0][1]], authkey)
+    finally:
+        stop_shards(connections, [process for process, _ in shards])
+
+def test_shard_survives_client_reset_mid_request():
+    shards, authkey = start_local_shards(DOCS_TEXT, 1)
+    connections = []
+    try:
+        conn = Client(shards[0][1], authkey=authkey)
+        conn.send(('stats',))
+        # Close with an RST so the shard's reply hits a reset connection
+        sock = socket.socket(fileno=os.dup(conn.fileno()))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        sock.close()
+        conn.close()
+
+        connections = connect_shards([shards[0][1]], authkey)
+        assert search_shards(connections, 'Create fillable forms', top_k=1)
+    finally:
+        stop_shards(connections, [process for process, _ in shards])
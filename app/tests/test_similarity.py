@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from similarity import top_k_similarity
+
+def expected_top_k(queries, matrix, k):
+    """Full cosine similarity sorted by score, lower row index first on ties"""
+    scores = cosine_similarity(queries, matrix)
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+def test_blocked_top_k_matches_full_similarity():
+    rng = np.random.RandomState(0)
+    matrix = sp.random(500, 40, density=0.1, format='csr', random_state=rng)
+    matrix = sp.vstack([matrix, matrix[:50]]).tocsr()  # duplicated rows produce ties
+    queries = sp.random(7, 40, density=0.3, format='csr', random_state=rng)
+
+    expected_indices, expected_scores = expected_top_k(queries, matrix, 10)
+    for workers in (1, 4):
+        indices, scores = top_k_similarity(queries, matrix, k=10, block_size=64, workers=workers)
+        assert np.array_equal(indices, expected_indices)
+        assert np.allclose(scores, expected_scores)
+
+def test_float32_dense_and_process_pool():
+    rng = np.random.RandomState(1)
+    matrix = rng.rand(300, 16)
+    queries = rng.rand(3, 16)
+
+    expected_indices, expected_scores = expected_top_k(queries, matrix, 5)
+    indices, scores = top_k_similarity(queries, matrix, k=5, block_size=50, workers=2, dtype=np.float32, use_processes=True)
+
+    assert scores.dtype == np.float32
+    assert np.array_equal(indices, expected_indices)
+    assert np.allclose(scores, expected_scores, atol=1e-5)
+
+def test_k_larger_than_rows():
+    indices, scores = top_k_similarity(np.eye(2), np.eye(2), k=5)
+    assert indices.tolist() == [[0, 1], [1, 0]]
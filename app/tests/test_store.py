@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from store import open_store, store_documents, rank_sections_store, fts_query, process_store
+
+DOCS_TEXT = {
+    'forms.pdf': [(1, 'CREATING FORMS\nCreate fillable forms for onboarding.'), (2, 'no section here')],
+    'export.pdf': [(1, 'EXPORTING\nExport a PDF to Word.')]
+}
+
+def test_fts_query_quotes_terms():
+    assert fts_query('Create "fillable" forms AND create') == '"create" OR "fillable" OR "forms"'
+
+def test_store_ranks_and_replaces_documents():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'corpus.db')
+        conn = open_store(db_path)
+        store_documents(conn, DOCS_TEXT)
+        store_documents(conn, {'forms.pdf': DOCS_TEXT['forms.pdf']})
+
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0] == 3
+
+        ranked = rank_sections_store(conn, 'HR professional', 'Create fillable forms')
+        assert ranked[0]['document'] == 'forms.pdf'
+        assert ranked[0]['section_title'] == 'CREATING FORMS'
+        conn.close()
+
+        result = process_store('HR professional', 'Create fillable forms', db_path)
+        assert result['metadata']['input_documents'] == ['export.pdf', 'forms.pdf']
+        assert result['extracted_sections'][0]['page_number'] == 1
+        assert result['subsection_analysis'][0]['refined_text'].startswith("From 'forms.pdf' - CREATING FORMS:")
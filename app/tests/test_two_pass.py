@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+
+import fitz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils import scan_pdf_headings, extract_pages
+from two_pass import extract_two_pass, select_candidate_pages
+
+PAGES = [
+    ('EXPORTING', 'Export a PDF to Word or Excel.'),
+    ('CREATING FORMS', 'Create fillable forms for onboarding.'),
+    ('SHARING', 'Share a link with reviewers.')
+]
+
+def write_manual(path, toc=None):
+    """Write a PDF with a heading at the top of each page and body text lower down"""
+    with fitz.open() as doc:
+        for heading, body in PAGES:
+            page = doc.new_page()
+            page.insert_text((72, 72), heading)
+            page.insert_text((72, 600), body)
+        if toc:
+            doc.set_toc(toc)
+        doc.save(path)
+
+def test_scan_reads_only_headings():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'manual.pdf')
+        write_manual(path)
+
+        headings = scan_pdf_headings(path)
+        assert [text.strip() for _, text in headings] == ['EXPORTING', 'CREATING FORMS', 'SHARING']
+        assert 'Export a PDF' in extract_pages(path, [1])[0][1]
+
+def test_scan_covers_pages_without_toc_entries():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'manual.pdf')
+        write_manual(path, toc=[[1, 'Forms', 2], [2, 'Fillable fields', 2]])
+
+        headings = scan_pdf_headings(path)
+        # Page 1 comes before the TOC; page 3 is still inside 'Forms' but keeps its own top band
+        assert [(page_num, text.strip()) for page_num, text in headings] == [
+            (1, 'EXPORTING'),
+            (2, 'Forms\nFillable fields\nCREATING FORMS'),
+            (3, 'Forms\nFillable fields\nSHARING')
+        ]
+
+def test_candidates_within_one_toc_chapter_are_ranked_by_their_top_band():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'manual.pdf')
+        write_manual(path, toc=[[1, 'Working with PDFs', 1]])
+
+        candidates = select_candidate_pages({'manual.pdf': scan_pdf_headings(path)}, 'fillable forms', max_pages=1)
+        assert candidates == {'manual.pdf': [2]}
+
+def test_two_pass_extracts_candidate_pages_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_manual(os.path.join(tmp, 'plain.pdf'))
+        write_manual(os.path.join(tmp, 'outline.pdf'), toc=[[1, heading, i + 1] for i, (heading, _) in enumerate(PAGES)])
+
+        with open(os.path.join(tmp, 'broken.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4 this is not really a pdf')
+
+        docs_text, quarantined = extract_two_pass(tmp, 'HR professional', 'Create fillable forms', max_pages=2)
+
+        assert sorted(docs_text) == ['outline.pdf', 'plain.pdf']
+        assert [item['filename'] for item in quarantined] == ['broken.pdf']
+        for content in docs_text.values():
+            assert [page_num for page_num, _ in content] == [2]
+            assert 'Create fillable forms' in content[0][1]